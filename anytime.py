@@ -0,0 +1,28 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Anytime results of MEPSO I, MEPSO II and PSO.
+# run(on_improvement=callback) calls callback(improvement) every time gbest is replaced, with the
+# route, its cost, the epoch, the iteration and the seconds elapsed since the start of the run.
+# The caller can use the routes while the run goes on, and stop the run by returning True.
+# PSO has no epochs, so its improvements always have epoch 0.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+from collections import namedtuple
+from time import perf_counter
+
+
+# a new gbest: the route is a copy, so it can be kept by the caller
+Improvement = namedtuple('Improvement', ['route', 'cost', 'epoch', 'iteration', 'elapsed'])
+
+
+# Gives the new gbest to the callback. If the callback returns True the run is stopped
+# through its stopping rules.
+def reportImprovement(callback, stopping, gbest, epoch, iteration, start_time):
+  improvement = Improvement(gbest.getPBest()[:], gbest.getCostPBest(), epoch, iteration, perf_counter() - start_time)
+  if callback(improvement):
+    stopping.stop('callback')
@@ -0,0 +1,54 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Checkpoints of a MEPSO I / MEPSO II run, written at the end of every epoch.
+# An epoch starts from a new population, so the state that goes from one epoch to the next is small:
+# gbest, the elite solution, the epoch counter, the sampled gbest costs, the adaptive parameters
+# and the state of the random generator. Restoring it lets a run continue exactly as it would have.
+# The file is a pickle of that state, with the routes kept as int arrays and the 624 words of
+# the Mersenne Twister packed as raw bytes.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+from array import array
+import os
+import pickle
+
+
+# version of the contents of the file
+CHECKPOINT_VERSION = 1
+
+
+# Packs the state returned by random.getstate() into bytes
+def packRandomState(state):
+  version, internal, gauss_next = state
+  return version, array('I', internal).tobytes(), gauss_next
+
+# Inverse of packRandomState (the result can be given to random.setstate())
+def unpackRandomState(packed):
+  version, internal, gauss_next = packed
+  words = array('I')
+  words.frombytes(internal)
+  return version, tuple(words), gauss_next
+
+# Writes the state of a run (a dict). The previous checkpoint is replaced only once the new
+# one is complete, so a crash while writing leaves the last good checkpoint on disk.
+def saveCheckpoint(file_name, state):
+  state = dict(state, version=CHECKPOINT_VERSION)
+  state['random'] = packRandomState(state['random'])
+  temporary = file_name + '.' + str(os.getpid()) + '.tmp'
+  with open(temporary, 'wb') as outfile:
+    pickle.dump(state, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+  os.replace(temporary, file_name)
+
+# Reads a checkpoint written by saveCheckpoint
+def loadCheckpoint(file_name):
+  with open(file_name, 'rb') as infile:
+    state = pickle.load(infile)
+  if state.get('version') != CHECKPOINT_VERSION:
+    raise ValueError(file_name + " is not a checkpoint of this version")
+  state['random'] = unpackRandomState(state['random'])
+  return state
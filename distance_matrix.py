@@ -0,0 +1,168 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Distance matrix construction for the TSPLIB instances used by MEPSO I, MEPSO II and PSO.
+# All the pairs are computed at once with NumPy from the coordinate arrays, so the time spent
+# loading an instance no longer depends on the per-pair cost of the Python interpreter.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+import hashlib
+import os
+import re
+import numpy as np
+import tsplib95
+
+
+# Distance stored between a city and itself (and between two cities with the same coordinates)
+# so that the solvers never choose such an edge
+INFINITE_DISTANCE = 10000000
+
+# Earth radius used by the GEO edge weight type
+EARTH_RADIUS = 6378.388
+
+# Number of nearest cities kept in the candidate list of every city
+NEIGHBOR_LIST_SIZE = 10
+
+# Version of the stored files, part of their names. Increase it whenever the matrices (or the
+# candidate lists) are built differently, so the files written before are not used again.
+CACHE_VERSION = 1
+
+# Directory where the built matrices are stored (one .npy file per instance, plus its coordinates
+# and candidate lists)
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distance_cache')
+
+
+# Convert GEO coordinates (DDD.MM, degrees and minutes) into radians
+def geoToRadians(values):
+  deg = np.trunc(values)
+  min = values - deg
+  return np.pi * (deg + 5.0 * min / 3.0) / 180.0
+
+# Build the full N x N matrix of a coordinate instance.
+# Supported edge weight types are GEO, ATT and EUC_2D (any other type is treated as EUC_2D).
+def buildDistanceMatrix(x, y, edge_weight_type):
+  x = np.asarray(x, dtype=np.float64)
+  y = np.asarray(y, dtype=np.float64)
+
+  #  edge weight type GEO means geographic coordinates
+  if edge_weight_type == "GEO":
+    latitude = geoToRadians(x)
+    longitude = geoToRadians(y)
+    q1 = np.cos(longitude[:, None] - longitude[None, :])
+    q2 = np.cos(latitude[:, None] - latitude[None, :])
+    q3 = np.cos(latitude[:, None] + latitude[None, :])
+    arc = np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0))
+    dist = (EARTH_RADIUS * arc + 1.0).astype(np.int64)
+    np.fill_diagonal(dist, 0)
+  # pseudo-Euclidean distance of the att48 and att532 instances
+  elif edge_weight_type == "ATT":
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    r = np.sqrt((dx * dx + dy * dy) / 10.0)
+    dist = (r + 0.5).astype(np.int64)
+    dist[dist < r] += 1
+  else:
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    dist = (np.sqrt(dx * dx + dy * dy) + 0.5).astype(np.int64)
+
+  dist[dist == 0] = INFINITE_DISTANCE
+  return dist.astype(np.int32)
+
+# Build the full matrix of an instance given with EDGE_WEIGHT_SECTION
+def buildExplicitMatrix(tsp):
+  if tsp.edge_weight_format == "LOWER_DIAG_ROW":
+    values = np.array([element for row in tsp.edge_weights for element in row], dtype=np.int32)
+    M = tsp.dimension
+    full_matrix = np.zeros((M, M), dtype=np.int32)
+    rows, columns = np.tril_indices(M)
+    full_matrix[rows, columns] = values
+    # Reflect the values over the diagonal
+    full_matrix[columns, rows] = values
+    return full_matrix
+  return np.array(tsp.edge_weights, dtype=np.int32)
+
+# Read a TSP file and return its distance matrix (int32) together with the x and y coordinates.
+# The coordinates are empty lists for explicit instances.
+def loadDistanceMatrix(file_name):
+  tsp = tsplib95.load(file_name)
+  if tsp.is_explicit():
+    return buildExplicitMatrix(tsp), [], []
+
+  nodes = sorted(tsp.node_coords)
+  x = [float(tsp.node_coords[node][0]) for node in nodes]
+  y = [float(tsp.node_coords[node][1]) for node in nodes]
+  return buildDistanceMatrix(x, y, tsp.edge_weight_type), x, y
+
+# Write to a temporary file first so that a concurrent run never maps a partial file
+def saveCacheFile(target, data):
+  temporary = target + '.' + str(os.getpid()) + '.tmp'
+  with open(temporary, 'wb') as outfile:
+    np.save(outfile, data)
+  os.replace(temporary, target)
+
+# Returns the cache key of an instance: its edge weight type and the cache version followed by a
+# hash of the file contents, so that editing the file or the builder produces a different key
+def instanceKey(file_name):
+  with open(file_name, 'rb') as infile:
+    content = infile.read()
+  match = re.search(rb'EDGE_WEIGHT_TYPE\s*:\s*(\w+)', content)
+  edgeWeightType = match.group(1).decode() if match else 'UNKNOWN'
+  digest = 'v' + str(CACHE_VERSION) + '-' + hashlib.sha1(content).hexdigest()[:16]
+  return edgeWeightType, digest
+
+# Same as loadDistanceMatrix, but the matrix is stored on disk the first time the instance is read.
+# Later loads map the stored file into memory (read-only) instead of building it again.
+# Entries of older versions of the same file (or of the cache) are removed when a new one is written.
+def cachedDistanceMatrix(file_name, cache_dir=CACHE_DIRECTORY):
+  edgeWeightType, digest = instanceKey(file_name)
+  name = os.path.splitext(os.path.basename(file_name))[0]
+  prefix = name + '-' + edgeWeightType + '-'
+  matrixFile = os.path.join(cache_dir, prefix + digest + '.npy')
+  coordsFile = os.path.join(cache_dir, prefix + digest + '-coords.npy')
+
+  if os.path.exists(matrixFile) and os.path.exists(coordsFile):
+    matrix = np.load(matrixFile, mmap_mode='r')
+    coords = np.load(coordsFile)
+    return matrix, coords[0].tolist(), coords[1].tolist()
+
+  matrix, x, y = loadDistanceMatrix(file_name)
+
+  os.makedirs(cache_dir, exist_ok=True)
+  for entry in os.listdir(cache_dir):
+    if entry.startswith(prefix) and not entry.startswith(prefix + digest):
+      os.remove(os.path.join(cache_dir, entry))
+  saveCacheFile(coordsFile, np.array([x, y], dtype=np.float64))
+  saveCacheFile(matrixFile, matrix)
+
+  return np.load(matrixFile, mmap_mode='r'), x, y
+
+# Returns the k nearest cities of every city as an (N, k) int32 matrix, nearest first.
+# The city itself is never among its neighbors.
+def neighborLists(matrix, k):
+  costs = np.array(matrix, dtype=np.int64)
+  size = len(costs)
+  k = min(k, size - 1)
+  if k <= 0:
+    return np.zeros((size, 0), dtype=np.int32)
+  np.fill_diagonal(costs, np.iinfo(np.int64).max)
+  nearest = np.argpartition(costs, k - 1, axis=1)[:, :k]
+  order = np.argsort(np.take_along_axis(costs, nearest, axis=1), axis=1, kind='stable')
+  return np.take_along_axis(nearest, order, axis=1).astype(np.int32)
+
+# Same as neighborLists over the matrix of cachedDistanceMatrix; the lists are stored next to the
+# matrix the first time they are built, so every run (and every worker) on the instance reads them
+def cachedNeighborLists(file_name, k=NEIGHBOR_LIST_SIZE, cache_dir=CACHE_DIRECTORY):
+  matrix, x, y = cachedDistanceMatrix(file_name, cache_dir)
+  edgeWeightType, digest = instanceKey(file_name)
+  name = os.path.splitext(os.path.basename(file_name))[0]
+  neighborsFile = os.path.join(cache_dir, name + '-' + edgeWeightType + '-' + digest + '-neighbors' + str(k) + '.npy')
+  if os.path.exists(neighborsFile):
+    return np.load(neighborsFile)
+  neighbors = neighborLists(matrix, k)
+  saveCacheFile(neighborsFile, neighbors)
+  return neighbors
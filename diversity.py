@@ -0,0 +1,41 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Diversity of a population of routes.
+# The population is stacked into a 2-D integer matrix and all the pairwise distances are computed
+# in one vectorized pass, instead of comparing the routes pair by pair in Python.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+import numpy as np
+from route import stackRoutes
+
+
+# Returns the (P, P) matrix of Hamming distances (number of positions with different cities)
+def hammingDistances(solutions):
+  routes = stackRoutes(solutions)
+  return (routes[:, None, :] != routes[None, :, :]).sum(axis=2)
+
+# Returns the (P, P) matrix of edge distances: the number of edges of a route (as a closed tour)
+# that are not in the other one, in either direction
+def edgeDistances(solutions):
+  routes = stackRoutes(solutions)
+  nextCities = np.roll(routes, -1, axis=1)
+  # successor[q, city] is the city that follows city in route q
+  successor = np.full((len(routes), routes.max() + 1), -1, dtype=routes.dtype)
+  np.put_along_axis(successor, routes, nextCities, axis=1)
+  # shared[q, p, i] tells if the i-th edge of route p is also an edge of route q
+  shared = (successor[:, routes] == nextCities[None, :, :]) | (successor[:, nextCities] == routes[None, :, :])
+  return routes.shape[1] - shared.sum(axis=2)
+
+# Average distance between the pairs of different routes of the population
+# (metric is "hamming" or "edge")
+def averageDiversity(solutions, metric="hamming"):
+  hamming = hammingDistances(solutions)
+  # equal routes are not counted, as in the pairwise comparison of the solvers
+  different = hamming > 0
+  distances = edgeDistances(solutions) if metric == "edge" else hamming
+  return int(distances[different].sum()) / int(different.sum())
@@ -0,0 +1,205 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Runs the independent replicates of an experiment (MEPSO I, MEPSO II or PSO) on a pool of processes.
+# A single read-only copy of the distance matrix is kept in shared memory and every worker
+# attaches to it, instead of receiving its own pickled list of lists.
+# Each replicate can be given its own seed (seed base + replicate number), so the results of an
+# experiment do not depend on the number of workers nor on the order in which they finish.
+#
+# The command line runner writes the rows to the results file as the replicates finish (see results_sink.py).
+#
+# Usage: python experiment.py --instance eil51.tsp --algorithm mepso_I --replicates 100 --seed-base 0 --workers 8
+#        [--seed-fraction 0.2 --seed-method greedy] [--candidate-probability 0.5]
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+import argparse
+import importlib
+import os
+import random
+from operator import itemgetter
+from multiprocessing import Pool
+from multiprocessing import shared_memory
+import numpy as np
+from distance_matrix import cachedDistanceMatrix, cachedNeighborLists
+from results_sink import ResultsSink
+from seeding import SEED_METHODS
+
+
+# state of a worker process: the solver module and the shared matrix it is attached to
+WORKER = {}
+
+# algorithms that can be run (the name of their module)
+ALGORITHMS = ['mepso_I', 'mepso_II', 'pso']
+
+# directory of the TSPLIB instances
+BENCHMARK_DIRECTORY = 'Benchmark_problems'
+
+
+# Copy the distance matrix into a new shared memory block
+def shareDistanceMatrix(matrix):
+  matrix = np.ascontiguousarray(matrix, dtype=np.int32)
+  block = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+  shared = np.ndarray(matrix.shape, dtype=np.int32, buffer=block.buf)
+  shared[:] = matrix
+  del shared
+  return block
+
+# Attach to a shared distance matrix of the given size.
+# The rows are read-only memoryviews over the shared block, so GRAPH[i][j] works
+# as with a list of lists and returns a Python int, without copying the matrix.
+# The NumPy view over the same block is used to evaluate many routes at once.
+def attachDistanceMatrix(name, size):
+  block = shared_memory.SharedMemory(name=name)
+  flat = block.buf[:size * size * 4].cast('i').toreadonly()
+  rows = [flat[i * size:(i + 1) * size] for i in range(size)]
+  matrix = np.frombuffer(flat, dtype=np.intc).reshape(size, size)
+  return block, flat, rows, matrix
+
+# Make the matrix the GRAPH of the solver module, as the __main__ block of each script does.
+# neighbors are the candidate lists of the cities (built by the graph when they are needed if None)
+# and options the keyword arguments given to runReplicate.
+def setupSolverModule(algorithm, rows, matrix=None, neighbors=None, options=None):
+  module = importlib.import_module(algorithm)
+  module.GRAPH = rows
+  module.GRAPH_SIZE = len(rows)
+  WORKER['module'] = module
+  WORKER['graph'] = module.Graph(len(rows), rows, matrix, neighbors)
+  WORKER['options'] = options or {}
+
+# Pool initializer: attach to the shared matrix and prepare the solver module
+def initWorker(algorithm, name, size, neighbors=None, options=None):
+  block, flat, rows, matrix = attachDistanceMatrix(name, size)
+  # the views stay attached for the life of the worker; the parent unlinks the block at the end
+  WORKER['block'] = block
+  WORKER['flat'] = flat
+  setupSolverModule(algorithm, rows, matrix, neighbors, options)
+  # the forked workers inherit the random state of the parent
+  random.seed()
+
+# Runs one replicate in the current process and returns (replicate, seed, row of the results file).
+# The random generator is seeded first when the replicate has a seed.
+def runWorkerReplicate(task):
+  replicate, seed = task
+  if seed is not None:
+    random.seed(seed)
+  return replicate, seed, WORKER['module'].runReplicate(WORKER['graph'], **WORKER['options'])
+
+# Run the replicates of an algorithm ('mepso_I', 'mepso_II' or 'pso') on the given matrix and
+# yield (replicate, seed, row) as soon as each replicate finishes, in no particular order.
+# With a seed base, replicate i is seeded with seed_base + i; otherwise every worker is seeded once
+# from the system. The replicates in skip are not run. The candidate lists (neighbors) are given to
+# every worker, so the workers do not build them again. options are given to runReplicate
+# (seed_fraction, seed_method and, for MEPSO I and II, candidate_probability).
+def iterateExperiment(algorithm, matrix, replicates=100, workers=None, seed_base=None, skip=(), neighbors=None,
+                      options=None):
+  tasks = []
+  for replicate in range(replicates):
+    if replicate not in skip:
+      tasks.append((replicate, None if seed_base is None else seed_base + replicate))
+  if not tasks:
+    return
+  if workers is None:
+    workers = os.cpu_count()
+  workers = max(1, min(workers, len(tasks)))
+  size = len(matrix)
+
+  if workers == 1:
+    setupSolverModule(algorithm, matrix, neighbors=neighbors, options=options)
+    for task in tasks:
+      yield runWorkerReplicate(task)
+    return
+
+  block = shareDistanceMatrix(matrix)
+  try:
+    with Pool(workers, initializer=initWorker, initargs=(algorithm, block.name, size, neighbors, options)) as pool:
+      for result in pool.imap_unordered(runWorkerReplicate, tasks):
+        yield result
+  finally:
+    # this is the only cleanup of the shared block: the pool workers end with os._exit (or are
+    # terminated when the pool is closed), so they never run any cleanup of their own
+    block.close()
+    block.unlink()
+
+# Same as iterateExperiment, but returns the rows of the results file in the order of the replicates
+def runExperiment(algorithm, matrix, replicates=100, workers=None, seed_base=None, neighbors=None, options=None):
+  results = sorted(iterateExperiment(algorithm, matrix, replicates, workers, seed_base, neighbors=neighbors,
+                                     options=options), key=itemgetter(0))
+  return [row for replicate, seed, row in results]
+
+# Returns the path of an instance given by its path or by its name in the benchmark directory
+def instancePath(instance):
+  if os.path.exists(instance):
+    return instance
+  return os.path.join(os.path.dirname(os.path.abspath(__file__)), BENCHMARK_DIRECTORY, instance)
+
+# Command line options of the experiment runner
+def parseArguments(argv=None):
+  parser = argparse.ArgumentParser(description="Runs independent replicates of MEPSO I, MEPSO II or PSO on a TSPLIB instance.")
+  parser.add_argument('--instance', default='ulysses16.tsp', help="TSP file, or its name in " + BENCHMARK_DIRECTORY)
+  parser.add_argument('--algorithm', choices=ALGORITHMS, default='mepso_I')
+  parser.add_argument('--replicates', type=int, default=100, help="number of independent runs")
+  parser.add_argument('--seed-base', type=int, default=None,
+                      help="replicate i is seeded with SEED_BASE + i (random seeds when omitted)")
+  parser.add_argument('--workers', type=int, default=None, help="number of processes (all the cores by default)")
+  parser.add_argument('--output', default=None,
+                      help="results file, CSV or .jsonl (ALGORITHM.csv by default)")
+  parser.add_argument('--resume', action='store_true',
+                      help="keep the replicates already in the results file and run only the missing ones")
+  parser.add_argument('--overwrite', action='store_true',
+                      help="replace a results file that already has results (an error otherwise)")
+  parser.add_argument('--seed-fraction', type=float, default=0.0,
+                      help="fraction of every initial population built with the seed method (see seeding.py)")
+  parser.add_argument('--seed-method', choices=SEED_METHODS, default='nearest')
+  parser.add_argument('--candidate-probability', type=float, default=0.0,
+                      help="probability that a mutation joins a city to one of its nearest cities (MEPSO I and II)")
+  arguments = parser.parse_args(argv)
+  if arguments.algorithm == 'pso' and arguments.candidate_probability > 0.0:
+    parser.error("--candidate-probability is not available for pso (it has no mutation)")
+  arguments.output = arguments.output or arguments.algorithm + '.csv'
+  # checked before the instance is loaded (ResultsSink raises the same error)
+  hasResults = os.path.exists(arguments.output) and os.path.getsize(arguments.output) > 0
+  if hasResults and not arguments.resume and not arguments.overwrite:
+    parser.error(arguments.output + " already has results (use --resume or --overwrite)")
+  return arguments
+
+# Keyword arguments of runReplicate given by the command line options
+def replicateOptions(arguments):
+  options = {'seed_fraction': arguments.seed_fraction, 'seed_method': arguments.seed_method}
+  if arguments.algorithm != 'pso':
+    options['candidate_probability'] = arguments.candidate_probability
+  return options
+
+# True when the options use the candidate lists (the savings seeds and the uniform moves do not)
+def usesNeighborLists(arguments):
+  seeded = arguments.seed_fraction > 0.0 and arguments.seed_method != 'savings'
+  return seeded or arguments.candidate_probability > 0.0
+
+def main(argv=None):
+  arguments = parseArguments(argv)
+  matrix, x, y = cachedDistanceMatrix(instancePath(arguments.instance))
+  neighbors = None
+  if usesNeighborLists(arguments):
+    neighbors = cachedNeighborLists(instancePath(arguments.instance))
+  print("Dimension: ", len(matrix))
+
+  output = arguments.output
+  # every row is written as soon as its replicate finishes
+  header = importlib.import_module(arguments.algorithm).RESULTS_HEADER
+  with ResultsSink(output, header, resume=arguments.resume, overwrite=arguments.overwrite) as sink:
+    if sink.completed:
+      print("Replicates already done: ", len(sink.completed))
+    for replicate, seed, row in iterateExperiment(arguments.algorithm, matrix.tolist(), replicates=arguments.replicates,
+                                                  workers=arguments.workers, seed_base=arguments.seed_base,
+                                                  skip=sink.completed, neighbors=neighbors,
+                                                  options=replicateOptions(arguments)):
+      sink.write(replicate, seed, row)
+  print("Results: ", output)
+
+
+if __name__ == "__main__":
+  main()
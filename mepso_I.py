@@ -12,56 +12,118 @@
 
 
 from operator import attrgetter
-import random, sys, time, copy
+import random, sys, time
 import random
-import copy
-import csv
 import math
 import statistics
 from datetime import datetime
 from datetime import timedelta
-from time import process_time
-import tsplib95
+from time import process_time, perf_counter
+import numpy as np
+from distance_matrix import cachedDistanceMatrix, neighborLists, NEIGHBOR_LIST_SIZE
+from experiment import iterateExperiment
+from results_sink import ResultsSink
+from checkpoint import saveCheckpoint, loadCheckpoint
+from diversity import averageDiversity
+from stopping import StoppingRules
+from anytime import reportImprovement
+from running_statistics import RunningStatistics
+from savings import savingsTour
+from seeding import constructRoute, perturbRoute, seedRoute, SEED_METHODS
+from tour_cost import evaluateSwarmCosts, evaluateTourCost
+from route import newRoute, reverseSegment, RouteHistory, successorArray
 
-import gc
 
 
 
 # class that represents a graph
 class Graph:
 
-  def __init__(self, amount_vertices, cost_table):
+  def __init__(self, amount_vertices, cost_table, cost_matrix=None, neighbors=None):
 
     self.costTable = cost_table
     self.graphSize = amount_vertices
-
-
-
-  # Calculate the objective function
-
+    # the same costs as a NumPy matrix, for the evaluation of many routes at once
+    if cost_matrix is None:
+      cost_matrix = np.array(cost_table, dtype=np.int32)
+    self.costMatrix = cost_matrix
+    # number of route costs computed so far (full evaluations and move deltas)
+    self.evaluations = 0
+    # K nearest cities of every city (built on first use when not given, see getNeighbors)
+    self.neighbors = neighbors
+    self.symmetric = self.isSymmetric()
+
+  # checks if the cost of every edge is the same in both directions
+  def isSymmetric(self):
+    return bool(np.array_equal(self.costMatrix, self.costMatrix.T))
+
+  # Returns the candidate lists of the cities (an (N, K) matrix, nearest first)
+  def getNeighbors(self):
+    if self.neighbors is None:
+      self.neighbors = neighborLists(self.costMatrix, NEIGHBOR_LIST_SIZE)
+    return self.neighbors
+
+  # Calculate the objective function of several routes in one call
+  def evaluateCosts(self, routes):
+    self.evaluations += len(routes)
+    return evaluateSwarmCosts(self.costMatrix, routes, depot=0)
+
+
+
+  # Calculate the objective function (the route starts and ends at the depot)
   def evaluateCost(self, route):
-    routeSize = len(route)
-    
-    # Determine the cost of traversing the cities
-    first = -1
-    second = -1
-    last = -1
-    cost = 0.0
-    #print(routeSize)
-    #print(route)
+    self.evaluations += 1
+    return evaluateTourCost(self.costTable, route, depot=0, cost_matrix=self.costMatrix)
 
-    i = 0
-    while routeSize > 1 and i < routeSize-1:
-      first = route[i]
-      second = route[i+1]
-      cost = cost + self.costTable[first][second]
-      i = i + 1
-    # Complete Hamiltonian circuit
-    last = route[routeSize-1]
-    first = route[0]
+  # The following functions return the change in the cost of a route (as given by evaluateCost)
+  # produced by a move, using only the edges touched by the move.
+  # The positions before the first city and after the last city are the depot.
+
+  # Cost change of moving the city at point2 to point1 (point1 < point2)
+  def insertionDelta(self, route, point1, point2):
+    self.evaluations += 1
+    table = self.costTable
+    depot = 0
+    before = route[point1-1] if point1 > 0 else depot
+    after = route[point2+1] if point2 < len(route)-1 else depot
+    first = route[point1]
+    moved = route[point2]
+    previous = route[point2-1]
+    return (table[before][moved] + table[moved][first] + table[previous][after]
+            - table[before][first] - table[previous][moved] - table[moved][after])
+
+  # Cost change of swapping the cities at point1 and point2 (point1 < point2)
+  def swapDelta(self, route, point1, point2):
+    self.evaluations += 1
+    table = self.costTable
     depot = 0
-    cost = cost + self.costTable[depot][first] + self.costTable[last][depot]
-    return cost
+    before = route[point1-1] if point1 > 0 else depot
+    after = route[point2+1] if point2 < len(route)-1 else depot
+    first = route[point1]
+    second = route[point2]
+    if point2 == point1 + 1:
+      return (table[before][second] + table[second][first] + table[first][after]
+              - table[before][first] - table[first][second] - table[second][after])
+    firstNext = route[point1+1]
+    secondPrevious = route[point2-1]
+    return (table[before][second] + table[second][firstNext] + table[secondPrevious][first] + table[first][after]
+            - table[before][first] - table[first][firstNext] - table[secondPrevious][second] - table[second][after])
+
+  # Cost change of reversing the cities between point1 and point2 (point1 < point2)
+  def reversalDelta(self, route, point1, point2):
+    self.evaluations += 1
+    table = self.costTable
+    depot = 0
+    before = route[point1-1] if point1 > 0 else depot
+    after = route[point2+1] if point2 < len(route)-1 else depot
+    first = route[point1]
+    last = route[point2]
+    delta = table[before][last] + table[first][after] - table[before][first] - table[last][after]
+    # the edges inside the segment are traversed in the opposite direction
+    if not self.symmetric:
+      for i in range(point1, point2):
+        delta += table[route[i+1]][route[i]] - table[route[i]][route[i+1]]
+    return delta
 
 
 
@@ -69,36 +131,29 @@ class Graph:
  
   def getRandomPaths(self, max_size):
     random_paths = []
+    # bytes of the routes already generated, to discard repeated routes in O(1)
+    generated = set()
     
     for i in range(max_size):
       
       list_temp = self.getRandomSolution(self.graphSize)
-      #print("Initial random sol: ", list_temp)
+      key = list_temp.tobytes()
 
-      if list_temp not in random_paths:
+      if key not in generated:
+        generated.add(key)
         random_paths.append(list_temp)
     return random_paths
     
   # Generate a random sequence and stores it
-  # as a Route
+  # as a Route (Fisher-Yates shuffle of the cities)
   def getRandomSolution(self, graph_size):
-    route = Chromosome()
-    visited = [0 for j in range(graph_size)]
-    city = -1
-    cityCount = 0
-    while cityCount < len(visited)-1:
-      city = random.randint(1, graph_size-1)
-      while visited[city] == 1:
-        city = random.randint(1, graph_size-1)        
-      route.append(city)
-      
-      visited[city] = 1
-      cityCount = cityCount + 1
-    #print("route", route, len(route))
+    # the depot (city 0) is not part of the route
+    route = newRoute(range(1, graph_size))
+    random.shuffle(route)
     return route
 
   def getRandomSolution__(self, graph_size):
-    route = Chromosome()
+    route = newRoute()
     visited = [0 for j in range(graph_size)]
     city = -1
     cityCount = 0
@@ -132,7 +187,7 @@ class Particle:
     self.velocity = []
 
     # past positions
-    self.history = []
+    self.history = RouteHistory()
 
   # set pbest
   def setPBest(self, new_pbest):
@@ -179,21 +234,53 @@ class Particle:
     del self.velocity[:]
 
 
+# Snapshot of the best solution found so far: the pbest route and cost of a particle.
+# It has the same getters as Particle, so gbest can be read in the same way, but taking it
+# copies a single route instead of deep-copying the particle with its velocity and history.
+class GBest:
+  __slots__ = ['pbest', 'pbestCost']
+  def __init__(self, particle):
+    self.pbest = particle.getPBest()[:]
+    self.pbestCost = particle.getCostPBest()
+
+  # returns the best route
+  def getPBest(self):
+    return self.pbest
+
+  # returns the cost of the best route
+  def getCostPBest(self):
+    return self.pbestCost
+
+
 # PSO algorithm
 class Solver:
 
 
-  def __init__(self, epoch_stop, graph, iterations, maxEpochs, size_population, beta=1, alfa=1):
+  def __init__(self, epoch_stop, graph, iterations, maxEpochs, size_population, beta=1, alfa=1, seed_fraction=0.0, seed_method='nearest',
+               candidate_probability=0.0):
     self.epoch_stop = epoch_stop
     self.graph = graph # the graph
     self.iterations = iterations # max of iterations
     self.maxEpochs = maxEpochs
     self.populationSize = size_population # size population
-    self.particles = Chromosome() # list of particles
+    self.particles = [] # list of particles
     self.beta = beta # the probability that all swap operators in swap sequence (gbest - x(t-1))
     self.alfa = alfa # the probability that all swap operators in swap sequence (pbest - x(t-1))
     self.last_epoch = 0
     self.costConvergence = None
+    # stopping rule that ended the last run (None if it ended by itself)
+    self.stopReason = None
+    # Hamming distance from the pbest of each particle to gbest (None when not computed)
+    self.gbestDistances = None
+    # fraction of the initial particles built with the seed method (see seeding.py)
+    if seed_method not in SEED_METHODS:
+      raise ValueError("Unknown seed method: " + str(seed_method))
+    self.seedFraction = seed_fraction
+    self.seedMethod = seed_method
+    # unperturbed greedy edge or savings route (built by the first call to getSeedSolution)
+    self.seedBase = None
+    # probability that a mutation is a reversal that joins a city to one of its candidate cities
+    self.candidateProbability = candidate_probability
 
     #graph_size = 5
     
@@ -201,17 +288,6 @@ class Solver:
     solutions = self.graph.getRandomPaths(self.populationSize)
     print("One initial solution: ", solutions[0])
     
-    # Generates a solution with the Savings method
-    
-    #amountOfGoodSolutions = int(round(size_population*0.01))
-    amountOfGoodSolutions = int(round(size_population*0.0))
-    for i in range(amountOfGoodSolutions):
-      solutions[i] = self.getSavingsSolution()
-    
-    #print("Solutin 0:", solutions[0])
-    #print("Good solution:", goodSolution)
-    #solutions[0] = goodSolution
-
     # checks if exists any solution
     if not solutions:
       print('Initial population empty! Try run the algorithm again...')
@@ -233,10 +309,14 @@ class Solver:
 
     
     ###bestSolutions[0] = goodSolution
+    # replaces part of the population by constructive tours
+    self.seedSolutions(bestSolutions)
     # creates the particles and initialization of swap sequences in all the particles
-    for solution in bestSolutions:
+    # evaluates all the solutions in one call
+    costs = self.graph.evaluateCosts(bestSolutions)
+    for solution, cost in zip(bestSolutions, costs):
       # creates a new particle
-      particle = Particle(solution=solution, cost=graph.evaluateCost(solution))
+      particle = Particle(solution=solution, cost=cost)
       # add the particle
       self.particles.append(particle)
     
@@ -244,23 +324,11 @@ class Solver:
     self.populationSize = len(self.particles)
 
   def initPopulation(self, population_size):
-    self.particles = Chromosome() # list of particles
+    self.particles = [] # list of particles
     solutions = self.graph.getRandomPaths(population_size)
     self.populationSize = population_size
 
     
-    # Generates a solution with the Savings method
-    
-    #amountOfGoodSolutions = int(round(size_population*0.01))
-    #amountOfGoodSolutions = int(round(population_size*0.0))
-    amountOfGoodSolutions = 0
-    for i in range(amountOfGoodSolutions):
-      solutions[i] = self.mutateGoodSolution(self.getSavingsSolution())
-    
-    #print("Solutin 0:", solutions[0])
-    #print("Good solution:", goodSolution)
-    #solutions[0] = goodSolution
-
     # checks if exists any solution
     if not solutions:
       print('Initial population empty! Try run the algorithm again...')
@@ -280,10 +348,14 @@ class Solver:
       del solutions[:]
     
     
+    # replaces part of the population by constructive tours
+    self.seedSolutions(bestSolutions)
     # creates the particles and initialization of swap sequences in all the particles
-    for solution in bestSolutions:
+    # evaluates all the solutions in one call
+    costs = self.graph.evaluateCosts(bestSolutions)
+    for solution, cost in zip(bestSolutions, costs):
       # creates a new particle
-      particle = Particle(solution=solution, cost=graph.evaluateCost(solution))
+      particle = Particle(solution=solution, cost=cost)
       # add the particle
       self.particles.append(particle)
       
@@ -306,27 +378,44 @@ class Solver:
     # Return the final count of differences
     return distance
   
-  def evaluateSolutionsDiversity(self, solutions):
-    simSum = 0
-    count = 0
-    for solution1 in solutions:
-      for solution2 in solutions:
-        if not (solution1 == solution2):
-          count += 1
-          #sim = self.cosine_similarity(solution1, solution2)
-          sim = self.hamming(solution1, solution2)
-          simSum += sim
-    return simSum / count
+  # Average distance between the different solutions of a population, computed for all
+  # the pairs at once (see diversity.py); metric is "hamming" or "edge"
+  def evaluateSolutionsDiversity(self, solutions, metric="hamming"):
+    return averageDiversity(solutions, metric)
     
+  # Returns the particle whose pbest is the farthest from gbest (Hamming distance), or None if
+  # every pbest is equal to gbest. The distances are kept in gbestDistances: an entry is only
+  # recomputed after the pbest of its particle changes, and all of them after gbest changes.
+  def getDissimilarParticle(self):
+    if self.gbestDistances is None:
+      self.gbestDistances = [None] * len(self.particles)
+    gbest = self.gbest.getPBest()
+    largest_dist = 0
+    dissimilar_particle = None
+    for index, neighbor_particle in enumerate(self.particles):
+      dist = self.gbestDistances[index]
+      if dist is None:
+        dist = self.gbestDistances[index] = self.hamming(gbest, neighbor_particle.getPBest())
+      if dist > largest_dist:
+        largest_dist = dist
+        dissimilar_particle = neighbor_particle
+    return dissimilar_particle
+
+  # Marks the distance of a particle to gbest as outdated (its pbest has changed).
+  # When the particle is gbest itself (gbest is a live particle in the first epoch), gbest has
+  # changed too, so all the distances are dropped.
+  def clearGBestDistance(self, index):
+    if self.gbestDistances is not None:
+      if self.particles[index] is self.gbest:
+        self.gbestDistances = None
+      else:
+        self.gbestDistances[index] = None
+
   def evaluateSolutionsAverageCost(self, solutions):
   
-    totalCost = 0.0
-    i = 0
-    for solution in solutions:
-      cost = self.evaluateCost(solution)
-      totalCost += cost
-      i+=1
-    averageCost = totalCost / float(i)
+    # cost of every solution (from and back to the depot, as in Graph.evaluateCost), in one call
+    costs = self.graph.evaluateCosts(solutions)
+    averageCost = sum(costs) / float(len(costs))
 
     return averageCost
 
@@ -334,6 +423,7 @@ class Solver:
   # set gbest (best particle of the population)
   def setGBest(self, new_gbest):
     self.gbest = new_gbest
+    self.gbestDistances = None
 
   # returns gbest (best particle of the population)
   def getGBest(self):
@@ -357,7 +447,11 @@ class Solver:
     alpha = max_epochs / math.log(initial_probability/9E-01)
     return initial_probability * math.exp(-current_epoch / alpha)
 
-  def run(self):
+  # Runs the algorithm. With a checkpoint file, the state of the run is saved there at the end of
+  # every epoch; with resume=True the run continues from the state saved in that file.
+  # stopping (see stopping.py) ends the run early, keeping the best route found so far in gbest.
+  # on_improvement is called with every new gbest (see anytime.py).
+  def run(self, checkpoint_file=None, resume=False, stopping=None, on_improvement=None):
     # variables for convergence data
     convergenceData = []
     iterationArray = []
@@ -374,6 +468,12 @@ class Solver:
     MAX_NEIGHBORS = 1
 
     startTime = datetime.now()
+    startClock = perf_counter()
+    # the callback stops the run through the stopping rules
+    if on_improvement is not None and stopping is None:
+      stopping = StoppingRules()
+    if stopping is not None:
+      stopping.start(self.graph.evaluations)
     
     # updates gbest (best particle of the population)
     #self.gbest = min(self.particles, key=attrgetter('pbestCost'))
@@ -383,6 +483,17 @@ class Solver:
     
     
     epoch = 0
+    # continues from the end of the epoch saved in the checkpoint
+    if resume:
+      state = loadCheckpoint(checkpoint_file)
+      epoch = state['epoch']
+      self.setEpoch(epoch)
+      self.setGBest(GBest(Particle(state['gbest'], state['gbestCost'])))
+      eliteSolution = state['eliteSolution']
+      bestCostSampling = state['bestCostSampling']
+      costCon = state['costConvergence']
+      batchCounter = state['batchCounter']
+      random.setstate(state['random'])
     while epoch < self.maxEpochs:
     #for epoch in range(self.maxEpochs):
       population_size = len(self.particles)
@@ -421,6 +532,10 @@ class Solver:
           maxIter = 3 * self.iterations
       else:
           maxIter = self.iterations
+      # the swarm has been replaced, so the cached distances to gbest are no longer valid
+      self.gbestDistances = None
+      # mean and standard deviation of the pbest costs, updated when a pbest changes
+      pbestStatistics = RunningStatistics(particle.pbestCost for particle in self.particles)
       for t in range(maxIter):
         convergencePerIteration = []
         batchCounter = batchCounter + 1
@@ -428,11 +543,11 @@ class Solver:
         # updates gbest (best particle of the population)
         #self.gbest = min(self.particles, key=attrgetter('pbestCost'))
         #costVariance = (self.particles, key=attrgetter('pbestCost'))
-        averageCost = statistics.mean(particle.pbestCost for particle in self.particles)
-        costStd = statistics.pstdev(particle.pbestCost for particle in self.particles)
+        averageCost = pbestStatistics.getMean()
+        costStd = pbestStatistics.getStd()
 
         # for each particle in the swarm
-        for particle in self.particles:
+        for index, particle in enumerate(self.particles):
           
           previousCost = particle.getCurrentSolutionCost()
           
@@ -440,7 +555,7 @@ class Solver:
           #velocity = []
           #velocity_alfa = []
           # what is the difference btn. copy.copy and list?
-          gbest = list(self.gbest.getPBest()) # gets solution of the gbest solution
+          gbest = self.gbest.getPBest()[:] # gets copy of the solution of the gbest solution
           #pbest = particle.getPBest()[:] # copy of the pbest solution
           ##newSolution = particle.getCurrentSolution()[:] # gets copy of the current solution of the particle
           
@@ -451,17 +566,18 @@ class Solver:
             ####new_particle_sol_cost = self.graph.evaluateCost(new_particle_sol)
             ####particle.setCurrentSolution(new_particle_sol)
             ####particle.setCostCurrentSolution(new_particle_sol_cost)
-            mutated_particle_solution = self.mutateGoodSolution(previousSolution)
-            mutated_particle_cost = self.graph.evaluateCost(mutated_particle_solution)
+            mutated_particle_solution, delta_cost = self.mutateWithDelta(previousSolution)
+            mutated_particle_cost = previousCost + delta_cost
             particle.setCurrentSolution(mutated_particle_solution)
             particle.setCostCurrentSolution(mutated_particle_cost)
           
           if len(particle.history) == HISTORY_SIZE:
-            particle.history.pop(0)
+            particle.history.popleft()
           
-          bestNeighbor = self.mutateGoodSolution(particle.getCurrentSolution())
+          # the cost of the neighbor is obtained from the edges changed by the mutation
+          bestNeighbor, delta_cost = self.mutateWithDelta(particle.getCurrentSolution())
           #bestNeighbor = particle.getCurrentSolution()[:]
-          bestNeighborCost = self.graph.evaluateCost(bestNeighbor)
+          bestNeighborCost = particle.getCurrentSolutionCost() + delta_cost
           
           """
           if previousCost < bestNeighborCost:
@@ -484,7 +600,7 @@ class Solver:
             newSolution = self.crossover(list(gbest), random_particle.getPBest())
           """  
           if random.random() <= self.beta:
-            new_son_solution, new_daughter_solution = self.crossover(list(newSolution), self.gbest.getPBest())
+            new_son_solution, new_daughter_solution = self.crossover(newSolution, self.gbest.getPBest())
             new_son_solution_cost = self.graph.evaluateCost(new_son_solution)
             new_daughter_solution_cost = self.graph.evaluateCost(new_daughter_solution)
             if new_son_solution_cost < new_daughter_solution_cost:
@@ -496,17 +612,12 @@ class Solver:
                 # gets cost of the current solution
                 newSolutionCost = new_daughter_solution_cost
           elif random.random() <= self.alfa:
-            largest_dist = 0
-            #less_common = len(gbest)
-            for neighbor_particle in self.particles:
-              sol = neighbor_particle.getPBest()
-              dist = self.hamming(gbest, sol)
-              if dist > largest_dist:
-                largest_dist = dist
-                #less_common = common
-                dissimilar_particle = neighbor_particle
-
-            new_son_solution, new_daughter_solution = self.crossover(list(newSolution), dissimilar_particle.getPBest())
+            # pbest farthest from gbest (the distances are cached between steps)
+            farthest_particle = self.getDissimilarParticle()
+            if farthest_particle is not None:
+              dissimilar_particle = farthest_particle
+
+            new_son_solution, new_daughter_solution = self.crossover(newSolution, dissimilar_particle.getPBest())
 
             #newSolution = self.crossover(list(gbest), random_particle.getPBest())
             new_son_solution_cost = self.graph.evaluateCost(new_son_solution)
@@ -555,7 +666,9 @@ class Solver:
           
           if random.random() < acceptance_prob:
             particle.setPBest(bestNeighbor)
+            self.clearGBestDistance(index)
             particle.setCostPBest(bestNeighborCost)
+            pbestStatistics.replace(pbCost, bestNeighborCost)
 
             #temperature = temperature + (pbCost - newSolutionCost) / (math.log(rnd))
           
@@ -568,7 +681,13 @@ class Solver:
           # check if new solution is gbest solution
          
           if particle.getCurrentSolutionCost() < gbestCost:
-            self.gbest = copy.deepcopy(particle)
+            self.gbest = GBest(particle)
+            self.gbestDistances = None
+            if on_improvement is not None:
+              reportImprovement(on_improvement, stopping, self.gbest, epoch, t, startClock)
+
+          if stopping is not None and stopping.shouldStop(self.gbest.getCostPBest(), self.graph.evaluations):
+            break
 
         eliteSolution = self.getGBest().getPBest()[:]
         eliteCost = self.gbest.getCostPBest()
@@ -590,6 +709,14 @@ class Solver:
           convergenceData.append(convergencePerEpoch)
           epochArray.append(epoch)
           epochBestCostArray.append(self.gbest.getCostPBest())
+
+        if stopping is not None and (stopping.reason is not None or stopping.endIteration(self.gbest.getCostPBest())):
+          break
+
+      # a stopping rule ended the run in the middle of this epoch
+      if stopping is not None and stopping.reason is not None:
+        self.setEpoch(epoch + 1)
+        break
     
       epoch = epoch + 1
       self.setEpoch(epoch)
@@ -605,10 +732,17 @@ class Solver:
       
       if std == 0:
         break
+
+      if checkpoint_file is not None:
+        saveCheckpoint(checkpoint_file, {'epoch': epoch, 'gbest': self.gbest.getPBest(), 'gbestCost': self.gbest.getCostPBest(),
+                                         'eliteSolution': eliteSolution, 'bestCostSampling': bestCostSampling,
+                                         'costConvergence': costCon, 'batchCounter': batchCounter,
+                                         'random': random.getstate()})
       
     
     print("What's going on?")
     self.costConvergence=costCon
+    self.stopReason = None if stopping is None else stopping.reason
 
 
     """
@@ -620,6 +754,10 @@ class Solver:
     print("Elapsed time: ", self.elapsedTime(startTime))
     """ 
     
+  # Continues a run from the state saved in a checkpoint file (see run)
+  def resume(self, checkpoint_file, stopping=None, on_improvement=None):
+    self.run(checkpoint_file, resume=True, stopping=stopping, on_improvement=on_improvement)
+
   def acceptanceProbability(self, previous_solution, new_solution, temperature, boltzmann):
     # If the new solution is better, accept it
     if new_solution < previous_solution:
@@ -656,6 +794,16 @@ class Solver:
 
 # Use reverse mutation for elite and savings solutions
   def mutateGoodSolution(self, elite_solution):
+    chromosome, delta = self.mutateWithDelta(elite_solution)
+    return chromosome
+
+  # Same mutation as mutateGoodSolution, but it also returns the change in cost
+  # of the route, which is computed only from the edges touched by the move
+  def mutateWithDelta(self, elite_solution):
+    if self.candidateProbability > 0.0 and random.random() < self.candidateProbability:
+      move = self.candidateReversal(elite_solution)
+      if move is not None:
+        return move
     chromosome = elite_solution[:]
 
     point1 = -1
@@ -669,6 +817,7 @@ class Solver:
     #chromosome[point1],chromosome[point2] = chromosome[point2],chromosome[point1]
     
     if random.random() < 0.2:
+      delta = self.graph.insertionDelta(elite_solution, point1, point2)
       temp = elite_solution[point2]
       for i in range(point1 + 1, point2):
         chromosome[i] = elite_solution[i - 1]  
@@ -683,16 +832,40 @@ class Solver:
     #print("Original: ", elite_solution)
     #print("Inserted: ", chromosome)
     elif random.random() < 0.2:
+      delta = self.graph.swapDelta(elite_solution, point1, point2)
       chromosome[point1],chromosome[point2] = chromosome[point2],chromosome[point1]
     # Inverse the genes between point1 and point2
     else:
-      while True:
-        chromosome[point1],chromosome[point2] = chromosome[point2],chromosome[point1]
-        point1 = point1 + 1
-        point2 = point2 - 1
-        if point1 > point2:
-          break
-    return chromosome
+      delta = self.graph.reversalDelta(elite_solution, point1, point2)
+      reverseSegment(chromosome, point1, point2)
+    return chromosome, delta
+
+  # Reversal that makes a random city adjacent to one of its candidate cities (see Graph.getNeighbors),
+  # so the new edge is one of the K shortest of the city. Returns the mutated route and the change
+  # in cost, or None when no such move is found after a number of tries.
+  def candidateReversal(self, elite_solution):
+    neighbors = self.graph.getNeighbors()
+    size = len(elite_solution)
+    if size < 4 or neighbors.shape[1] == 0:
+      return None
+    for attempt in range(size):
+      point1 = random.randint(0, size-1)
+      candidate = int(neighbors[elite_solution[point1], random.randint(0, neighbors.shape[1]-1)])
+      # the depot is not in the route
+      if candidate == 0:
+        continue
+      point2 = elite_solution.index(candidate)
+      if point2 > point1 + 1:
+        start, end = point1 + 1, point2
+      elif point2 < point1 - 1:
+        start, end = point2 + 1, point1
+      else:
+        continue
+      chromosome = elite_solution[:]
+      delta = self.graph.reversalDelta(elite_solution, start, end)
+      reverseSegment(chromosome, start, end)
+      return chromosome, delta
+    return None
 
 # Crossover operator with mutation
   # This is an ordered crossover in which the center part of the dad chromosome 
@@ -714,84 +887,9 @@ class Solver:
     #print("Point 2: ", point2)
     #print("Dad's chromosome: ", dadChromosome)
     #print("Mom's chromosome: ", momChromosome)
-    
-    sonChromosome = [-1 for j in range(len(dadChromosome))]
-
-    son_center_segment = list()
-    son_left_segment = list()
-    son_right_segment = list()
-  
-    daughterChromosome = [-1 for j in range(len(momChromosome))]
-
-    daughter_center_segment = list()
-    daughter_left_segment = list()
-    daughter_right_segment = list()
-    
-    # Copy the middle section
-    for i in range(point1, point2+1):
-      son_center_segment.append(dadChromosome[i])
-
-    for i in range(point1, point2+1):
-      daughter_center_segment.append(momChromosome[i])
-
-    # Fill in the right section of the son
-    i = point2 + 1
-    j = point2 + 1
-    gene = -1
-    while i < len(sonChromosome):
-      if j == len(momChromosome):
-        j = 0
-      while j < len(momChromosome):
-        gene = momChromosome[j]
-        j=j+1
-        if gene not in son_center_segment:
-          son_right_segment.append(gene)
-          i = i + 1
-          break
-    
-    # Fill in the right section of the daughter
-    i = point2 + 1
-    j = point2 + 1
-    gene = -1
-    while i < len(daughterChromosome):
-      if j == len(dadChromosome):
-        j = 0
-      while j < len(dadChromosome):
-        gene = dadChromosome[j]
-        j=j+1
-        if gene not in daughter_center_segment:
-          daughter_right_segment.append(gene)
-          i = i + 1
-          break
-      
-    # Fill in the left section of the son
-    i=0
-    j=0
-    gene = -1
-    while i < point1 and j < len(momChromosome):
-      while j < len(momChromosome):
-        gene = momChromosome[j]
-        j=j+1
-        if gene not in son_center_segment and gene not in son_right_segment:
-          son_left_segment.append(gene)
-          break
-      i = i + 1
-    
-    # Fill in the left section of the daughter
-    i=0
-    j=0
-    gene = -1
-    while i < point1 and j < len(dadChromosome):
-      while j < len(dadChromosome):
-        gene = dadChromosome[j]
-        j=j+1
-        if gene not in daughter_center_segment and gene not in daughter_right_segment:
-          daughter_left_segment.append(gene)
-          break
-      i = i + 1
 
-    sonChromosome = son_left_segment + son_center_segment + son_right_segment
-    daughterChromosome = daughter_left_segment + daughter_center_segment + daughter_right_segment
+    sonChromosome = self.orderedChild(dadChromosome, momChromosome, point1, point2)
+    daughterChromosome = self.orderedChild(momChromosome, dadChromosome, point1, point2)
     # Swap the contents of the two points
     ##sonChromosome[point1],sonChromosome[point2] = sonChromosome[point2],sonChromosome[point1]
     #print("Son: ", sonChromosome)
@@ -835,6 +933,43 @@ class Solver:
 
 
 
+  # Builds one offspring of crossover: the center part (point1 to point2) comes from the dad,
+  # the right part is filled with the genes of the mom read from point2+1 (wrapping around)
+  # and the left part with the remaining genes of the mom read from the start.
+  # The genes already inserted are marked in a mask, so each gene is checked in O(1)
+  # and the offspring is written directly into a copy of the dad.
+  def orderedChild(self, dadChromosome, momChromosome, point1, point2):
+    size = len(dadChromosome)
+    child = newRoute(dadChromosome)
+    inserted = bytearray(self.graph.graphSize)
+    for i in range(point1, point2+1):
+      inserted[dadChromosome[i]] = 1
+
+    # Fill in the right section
+    i = point2 + 1
+    j = point2 + 1
+    while i < size:
+      if j == size:
+        j = 0
+      gene = momChromosome[j]
+      j = j + 1
+      if not inserted[gene]:
+        child[i] = gene
+        inserted[gene] = 1
+        i = i + 1
+
+    # Fill in the left section
+    i = 0
+    j = 0
+    while i < point1:
+      gene = momChromosome[j]
+      j = j + 1
+      if not inserted[gene]:
+        child[i] = gene
+        inserted[gene] = 1
+        i = i + 1
+    return child
+
   # The ordered crossover operator
   def oxcrossover(self, dadRoute, momRoute):
     #print("")
@@ -854,9 +989,7 @@ class Solver:
     #print("Dad's route: ", dadRoute)
     #print("Mom's route: ", momRoute)
     
-    sonRoute = Route()
-    
-    sonRoute = [-1 for j in range(len(dadRoute))]
+    sonRoute = newRoute([-1] * len(dadRoute))
     
     # Copy the middle section
     for i in range(point1, point2+1):
@@ -927,8 +1060,12 @@ class Solver:
     #print("Cost of mom:", momCost)
     #print("Cost of dad:", dadCost)
     
-    sonRoute = [-1 for j in range(len(dadRoute))]
-    visited = [False for k in range(len(dadRoute))]
+    sonRoute = newRoute([-1] * len(dadRoute))
+    visited = [False for k in range(self.graph.graphSize)]
+
+    # successor of every city in each parent, built once per offspring
+    dadSuccessor = successorArray(dadRoute, self.graph.graphSize)
+    momSuccessor = successorArray(momRoute, self.graph.graphSize)
     
     firstGene = sonRoute[0] = dadRoute[0]
     visited[firstGene] = True
@@ -937,8 +1074,8 @@ class Solver:
     while i < len(dadRoute)+2:  
       fromGene = sonRoute[i-1]
       #print("From Gene:", fromGene)
-      connectedGeneInMom = self.getConnectedGene(fromGene, momRoute)
-      connectedGeneInDad = self.getConnectedGene(fromGene, dadRoute)
+      connectedGeneInMom = momSuccessor[fromGene]
+      connectedGeneInDad = dadSuccessor[fromGene]
       costMomEdge = GRAPH[fromGene][connectedGeneInMom]
       costDadEdge = GRAPH[fromGene][connectedGeneInDad]
       
@@ -995,13 +1132,17 @@ class Solver:
   # The alternative edge crossover
   def aexcrossover(self, dadRoute, momRoute):
     
-    sonRoute = [-1 for j in range(len(dadRoute))]
+    sonRoute = newRoute([-1] * len(dadRoute))
     
-    visited = [False for i in range(len(dadRoute))]
+    visited = [False for i in range(self.graph.graphSize)]
+
+    # successor of every city in each parent, built once per offspring
+    dadSuccessor = successorArray(dadRoute, self.graph.graphSize)
+    momSuccessor = successorArray(momRoute, self.graph.graphSize)
     
     fromGeneInDad = dadRoute[0]
     sonRoute[0] = fromGeneInDad
-    connectedGeneInDad = self.getConnectedGene(fromGeneInDad, dadRoute)
+    connectedGeneInDad = dadSuccessor[fromGeneInDad]
     sonRoute[1] = connectedGeneInDad
     visited[fromGeneInDad] = True
     visited[connectedGeneInDad] = True
@@ -1009,7 +1150,7 @@ class Solver:
     
     while i < len(dadRoute):
       fromGeneInMom = connectedGeneInDad
-      connectedGeneInMom = self.getConnectedGene(fromGeneInMom, momRoute)
+      connectedGeneInMom = momSuccessor[fromGeneInMom]
       if visited[connectedGeneInMom]:
         #print("Gene in Mom already visited:", connectedGeneInMom)
         connectedGeneInMom = self.getUnvisitedGene(momRoute, visited)
@@ -1019,7 +1160,7 @@ class Solver:
       visited[connectedGeneInMom] = True
       i += 1
       fromGeneInDad = connectedGeneInMom
-      connectedGeneInDad = self.getConnectedGene(fromGeneInDad, dadRoute)
+      connectedGeneInDad = dadSuccessor[fromGeneInDad]
       if visited[connectedGeneInDad]:
         #print("Gene in Dad already visited:", connectedGeneInDad)
         connectedGeneInDad = self.getUnvisitedGene(dadRoute, visited)
@@ -1031,11 +1172,8 @@ class Solver:
 
     #print("Son:", sonRoute)
     
-    missingGenes = False
-    for j in range(0,  len(dadRoute)-1):
-      if j not in sonRoute:
-        #print(j, " is missing")
-        missingGenes = True
+    # every city of the dad must be in the son
+    missingGenes = set(dadRoute).difference(sonRoute)
     if missingGenes:
       sys.exit("Gene is missing in son:")
       
@@ -1080,110 +1218,36 @@ class Solver:
     #print("Visiting status of gene:", visited[gene])
     return gene
 
-  # Generate a good solution based on the Clarke-Wright savings method
-  # Then scrambles it a bit by swapping two cities
+  # Generate a good solution based on the Clarke-Wright savings method (see savings.py).
+  # The route does not include the depot, as the other routes of MEPSO.
   def getSavingsSolution(self):
-    best = Route()
-    best.append(0)
-    savingsMatrix = self.generateSavingsMatrix()
-    first = savingsMatrix[0]
-    best.append(first.get_from_node())
-    best.append(first.get_to_node())
-    last = best[-1]
-
-    for i in range(GRAPH_SIZE - 3):
-      toNode = self.getNodeFromSavings(last, savingsMatrix, best)
-      best.append(toNode)
-      last = best[-1]
-    """  
-    # Select two random points in the savings result
-    point1 = -1
-    point2 = -1
-    while True:
-      point1 = random.randint(0, len(best)-1)
-      point2 = random.randint(0, len(best)-1)
-      if point1 != point2:
-        break
-    # Swap the contents of the two points
-    best[point1],best[point2] = best[point2],best[point1]
-    """
-    
-    # Do a reverse mutation
-    # Select two random points in the route of the parent
-    """
-    point1 = -1
-    point2 = -1
-    while True:
-      point1 = random.randint(0, len(best)-1)
-      point2 = random.randint(0, len(best)-1)
-      if point1 != point2:
-        break
-    # Inverse the genes between point1 and point2    
-    while True:
-      best[point1],best[point2] = best[point2],best[point1]
-      point1 = point1 + 1
-      point2 = point2 - 1
-      if point1 > point2:
-        break
-    """
-    return best
+    return newRoute(savingsTour(self.graph.costMatrix))
+
+  # Generates a route with the seed method of the solver. The greedy edge and savings routes do
+  # not change, so they are built once and only perturbed for every seed.
+  def getSeedSolution(self):
+    if self.seedMethod == 'nearest':
+      return seedRoute(self.seedMethod, self.graph.costMatrix, self.graph.getNeighbors(), depot=0)
+    if self.seedBase is None:
+      if self.seedMethod == 'savings':
+        self.seedBase = self.getSavingsSolution()
+      else:
+        self.seedBase = constructRoute(self.seedMethod, self.graph.costMatrix, self.graph.getNeighbors(), depot=0)
+    route = self.seedBase[:]
+    perturbRoute(route)
+    return route
 
-  # Calculate the objective function
-  def evaluateCost(self, route):
-    routeSize = len(route)
-    
-    # Determine the cost of traversing the cities
-    first = -1
-    second = -1
-    last = -1
-    cost = 0.0
-    #print(routeSize)
-    #print(route)
-    i = 0
-    while routeSize > 1 and i < routeSize-1:
-      first = route[i]
-      second = route[i+1]
-      cost = cost + GRAPH[first][second]
-      i = i + 1
-    # Complete Hamiltonian circuit
-    last = route[routeSize-1]
-    first = route[0]
-    cost = cost + GRAPH[last][first]
-    return cost  
-
-
-
-  def generateSavingsMatrix(self):
-    savingsMatrix = []
-    for i in range(1, GRAPH_SIZE):
-      for j in range(1, GRAPH_SIZE):
-        savings = GRAPH[i][0] + GRAPH[0][j] - GRAPH[i][j]
-        # saving = CWSA_mtx[i,-1] + CWSA_mtx[j,-1] - CWSA_mtx[i,j]
-        savingsMatrix.append(Savings(i, j, savings))
-    savingsMatrix = sorted(savingsMatrix, reverse=True)
-    return savingsMatrix
-    # sorted(student_objects, key=lambda student: student.age)
-
-  def getNodeFromSavings(self, last, savings_matrix  = [], best = []):
-    for i in range(len(savings_matrix)):
-      node = savings_matrix[i]
-      fromNode = node.get_from_node()
-      toNode = node.get_to_node()
-      #print("Last: ", last)
-      #print("fromNode:", fromNode)
-      #print("toNode:", toNode)
-      if fromNode == last and toNode not in best:
-        return toNode
+  # Replaces seedFraction of the solutions by seed routes. Slot 0 is left out of the count and
+  # never seeded, since after the first epoch run() puts the mutated elite there.
+  # The seeds fill the last slots of the list.
+  def seedSolutions(self, solutions):
+    amount = int(round((len(solutions) - 1) * self.seedFraction))
+    for i in range(len(solutions) - amount, len(solutions)):
+      solutions[i] = self.getSeedSolution()
 
-      
-  
-
-# Define Route as a subclass of list
-class Route(list):
-  def __init__(self):
-    self.elements = []
-  #def size(self):
-  #  return len(self.elements)
+  # Calculate the objective function (same as Graph.evaluateCost: the route starts and ends at the depot)
+  def evaluateCost(self, route):
+    return self.graph.evaluateCost(route)
 
 # An Individual stores its route along with
 # its cost and fitness.
@@ -1213,163 +1277,14 @@ class Individual:
     
 # Test code begins
 
-class Savings(object):
-  def __init__(self, from_node, to_node, savings_value):
-    self.from_node = from_node
-    self.to_node = to_node
-    self.savings_value = savings_value
-  
-  def get_from_node(self):
-    return self.from_node
-
-  def get_to_node(self):
-    return self.to_node
-        
-  def __repr__(self):
-    return repr((self.from_node, self.to_node, self.savings_value))
-    
-  def __lt__(self, other):
-    return self.savings_value < other.savings_value
-  
-  def __eq__(self, other):
-    return self.savings_value == other.savings_value
-
-
-class City:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-    
-    def set_x(self, x):
-        self.x = x
-    
-    def get_x(self):
-        return self.x
-    
-    def set_y(self, y):
-        self.y = y
-    
-    def get_y(self):
-        return self.y
-
-# Define Chromosome as a subclass of list
-class Chromosome(list):
-  def __init__(self):
-    self.elements = []
-
-
-
-# Nest nearest integer
-def nint(number):
-  return int(number + (0.5 if number > 0 else -0.5))
-  
-# Calculate Euclidean distance for one location
-def calculate_distance(x1, y1, x2, y2):
-    return math.sqrt(math.pow((x1 - x2), 2) + math.pow((y1 - y2), 2))
-
 def generateDistanceMatrix(file_name):
-  # Open input file
-  GRAPH = []
-  newDist = []
-  x = []
-  y = []  
-  tsp = tsplib95.load(file_name)
-  if (tsp.is_explicit() and tsp.edge_weight_format=="LOWER_DIAG_ROW"):
-    graph=tsp.edge_weights
-    listgraph = [element for row in graph for element in row]
-    M = tsp.dimension
-    full_matrix = [[0] * M for _ in range(M)]
-    k = 0
-    for i in range(M):
-        for j in range(i + 1):
-            full_matrix[i][j] = listgraph[k]
-            full_matrix[j][i] = listgraph[k]  # Reflejar los valores en la parte superior de la diagonal
-            k += 1
-    return full_matrix, x, y
-  elif(tsp.is_explicit()):
-    graph=tsp.edge_weights
-    return graph, x, y
-  else:    
-    infile = open(file_name, 'r') 
-
-    # Read instance header
-    name = infile.readline().strip().split()[1] # NAME
-    fileType = infile.readline().strip().split()[1] # TYPE
-    comment = infile.readline().strip().split()[1] # COMMENT
-    dimension = infile.readline().strip().split()[1] # DIMENSION
-    edgeWeightType = infile.readline().strip().split()[1] # EDGE_WEIGHT_TYPE
-    infile.readline()
-
-    # Read node list
-    nodelist = []
-    #N = int(dimension)
-    print("Dimension: ", dimension)
-    print("Edge weight type: ", edgeWeightType)
-    for i in range(0, int(dimension)):
-      x,y = infile.readline().strip().split()[1:]    
-      newCity = City(float(x), float(y))
-      nodelist.append(newCity)
-        #nodelist.append([float(x), float(y)])
-
-    # Close input file
-    infile.close()
-    GRAPH = []
-    newDist = []
-    x = []
-    y = []  
-
-    print("Dimension: ", dimension)
-    N = int(dimension)
-    for i  in range(0, N):
-      x_i = nodelist[i].get_x()
-      y_i = nodelist[i].get_y()
-      x.append(x_i)
-      y.append(y_i)
-      newDist = []
-      
-      for j in range(0, len(nodelist)):
-        x_j = nodelist[j].get_x()
-        y_j = nodelist[j].get_y()
-      
-        
-        #  edge weight type GEO means geographic coordinates
-        if edgeWeightType == "GEO":
-          deg = int(x_i)
-          min = x_i - deg
-          latitudeI = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          deg = int(y_i)
-          min = y_i - deg
-          longitudeI = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          deg = int(x_j)
-          min = x_j - deg
-          latitudeJ = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          deg = int(y_j)
-          min = y_j - deg
-          longitudeJ = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          R = 6378.388 # Earth radius
-          q1 = math.cos( longitudeI - longitudeJ )
-          q2 = math.cos( latitudeI - latitudeJ )
-          q3 = math.cos( latitudeI + latitudeJ )
-          dist = int((R * math.acos(0.5*((1.0+q1)*q2-(1.0-q1)*q3))+1.0))
-          
-          if i == j:
-            dist = 0
-        else:
-          dist = nint(calculate_distance(x_i, y_i, x_j, y_j))
-        if dist == 0:
-          dist = 10000000
-        #newDist = []
-        #print("Distance 1: ", dist)
-        newDist.append(dist)
-      GRAPH.append(newDist)
-    print("x: ", x)
-    print("y: ", y)
-      #print(GRAPH)
-    return GRAPH, x, y
+  # The matrix is built in bulk with NumPy and cached on disk (see distance_matrix.py),
+  # then handed to the solver as a list of lists
+  matrix, x, y = cachedDistanceMatrix(file_name)
+  print("Dimension: ", len(matrix))
+  print("x: ", x)
+  print("y: ", y)
+  return matrix.tolist(), x, y
 
 # coefficients for MT19937
 (w, n, m, r) = (32, 624, 397, 31)
@@ -1425,6 +1340,37 @@ def twist():
             xA = xA ^ a
         MT[i] = MT[(i + m) % n] ^ xA
 
+# columns of the results file (one row per replicate, as returned by runReplicate)
+RESULTS_HEADER = ["Solution", "Cost", "Comp. time", "last epoch", "epoch convergence","Convergence COSTS"]
+
+# Runs one replicate of the experiment and returns its row of the results file
+# seed_fraction, seed_method and candidate_probability are given to the Solver (see seeding.py
+# and Solver.candidateReversal)
+def runReplicate(graph, seed_fraction=0.0, seed_method='nearest', candidate_probability=0.0):
+  dimension = graph.graphSize
+  epoch_stop=int(round(.2*dimension))
+  results = []
+  #pso = Solver(epoch_stop, graph, iterations=1000, maxEpochs=200, size_population=pop_size, beta=0.29, alfa=0.12)
+  pso = Solver(epoch_stop, graph, iterations=int(round((dimension*600)/7)) , maxEpochs=200, size_population=7, beta=0.29, alfa=0.12,
+               seed_fraction=seed_fraction, seed_method=seed_method, candidate_probability=candidate_probability)
+  #Nodos(dimension)*Factor de 600 = iterations
+  #start_time = datetime.now()
+  start_process_time = process_time()
+  pso.run() # runs the PSO algorithm
+  results.append(pso.getGBest().getPBest().tolist())
+  results.append(pso.getGBest().getCostPBest())
+  epoch = pso.getEpoch()
+  epoch_convergence = epoch-epoch_stop
+  #dt = datetime.now() - start_time
+  #ms = (dt.days * 24 * 60 * 60 + dt.seconds) * 1000 + dt.microseconds / 1000.0
+  processing_time = (process_time() - start_process_time) * 1000.0
+  #results.append(ms)
+  results.append(processing_time)
+  results.append(epoch)
+  results.append(epoch_convergence)
+  results.append(pso.costConvergence)
+  return results
+
 if __name__ == "__main__":
   # Read a TSP file and convert x,y coordinates to distance matrix
   dimension = None
@@ -1501,35 +1447,14 @@ if __name__ == "__main__":
   """
 
   
-  results = ["Solution", "Cost", "Comp. time", "last epoch", "epoch convergence","Convergence COSTS"]
-  fileoutput = []
-  fileoutput.append(results)
   
   # def run_solver_with_params(params):
   #   iters = params
-  for i  in range(100):
-    results = []
-    #pso = Solver(epoch_stop, graph, iterations=1000, maxEpochs=200, size_population=pop_size, beta=0.29, alfa=0.12)
-    pso = Solver(epoch_stop, graph, iterations=int(round((dimension*600)/7)) , maxEpochs=200, size_population=7, beta=0.29, alfa=0.12)
-    #Nodos(dimension)*Factor de 600 = iterations
-    #start_time = datetime.now()
-    start_process_time = process_time()
-    pso.run() # runs the PSO algorithm
-    results.append(pso.getGBest().getPBest())
-    results.append(pso.getGBest().getCostPBest())
-    epoch = pso.getEpoch()
-    epoch_convergence = epoch-epoch_stop
-    #dt = datetime.now() - start_time
-    #ms = (dt.days * 24 * 60 * 60 + dt.seconds) * 1000 + dt.microseconds / 1000.0
-    processing_time = (process_time() - start_process_time) * 1000.0
-    #results.append(ms)
-    results.append(processing_time)
-    results.append(epoch)
-    results.append(epoch_convergence)
-    results.append(pso.costConvergence)
-    fileoutput.append(results)
-    #del pso
-    gc.collect()
+  # runs the 100 replicates on a pool of processes that share GRAPH (see experiment.py);
+  # each row is written to mepso_I.csv as soon as its replicate finishes (see results_sink.py)
+  with ResultsSink('mepso_I.csv', RESULTS_HEADER) as sink:
+    for replicate, seed, row in iterateExperiment('mepso_I', GRAPH, replicates=100):
+      sink.write(replicate, seed, row)
         
   #parameter_sets = [457,914,1371,1829,2286]
   #parameter_sets = [1486,2971,4457,5943,7429]
@@ -1608,11 +1533,6 @@ if __name__ == "__main__":
   # pso-results.csv
   
   
-  csvFile = open('mepso_I.csv', 'w', newline='')  
-  with csvFile: 
-    writer = csv.writer(csvFile)
-    writer.writerows(fileoutput)
-  csvFile.close()
   
 
   # shows the global best particle
@@ -15,30 +15,49 @@ from operator import attrgetter
 import random, sys, time, copy
 import random
 import copy
-import csv
 import math
-import statistics
 from datetime import datetime
 from datetime import timedelta
 # import matplotlib.pyplot as plt
 # import pandas as pd
-from time import process_time
-import tsplib95
+from time import process_time, perf_counter
+import numpy as np
+from distance_matrix import cachedDistanceMatrix, neighborLists, NEIGHBOR_LIST_SIZE
+from experiment import iterateExperiment
+from results_sink import ResultsSink
+from stopping import StoppingRules
+from anytime import reportImprovement
+from running_statistics import ConvergenceWindow
+from savings import savingsTour
+from seeding import constructRoute, perturbRoute, seedRoute, SEED_METHODS
+from tour_cost import evaluateSwarmCosts, evaluateTourCost
+from route import newRoute, reverseSegment
 #random.seed(0)
 
 # PSO algorithm
 class PSO:
 
 
-  def __init__(self, iteration_stop, graph, iterations, size_population, alfa=1, beta=1):
+  def __init__(self, iteration_stop, graph, iterations, size_population, alfa=1, beta=1, convergence_tolerance=0.0, seed_fraction=0.0, seed_method='nearest'):
     self.iteration_stop = iteration_stop
     self.deviation_iteration = int(round(iteration_stop/100))
+    # the run stops when the standard deviation of the last sampled gbest costs is not larger than this
+    self.convergenceTolerance = convergence_tolerance
     self.graph = graph # the graph
     self.iterations = iterations # max of iterations
     self.populationSize = size_population # size population
-    self.particles = Chromosome() # list of particles
+    self.particles = [] # list of particles
     self.beta = beta # the probability that all swap operators in swap sequence (gbest - x(t-1))
     self.alfa = alfa # the probability that all swap operators in swap sequence (pbest - x(t-1))
+    # stopping rule that ended the last run (None if it ended by itself)
+    self.stopReason = None
+    # fraction of the initial particles built with the seed method (see seeding.py)
+    if seed_method not in SEED_METHODS:
+      raise ValueError("Unknown seed method: " + str(seed_method))
+    self.seedFraction = seed_fraction
+    self.seedMethod = seed_method
+    # unperturbed greedy edge or savings route (built by the first call to getSeedSolution)
+    self.seedBase = None
     #graph_size = 5
     
     # initialized with a group of random particles (solutions)
@@ -61,10 +80,14 @@ class PSO:
       del solutions[:]
     
     ###bestSolutions[0] = goodSolution
+    # replaces part of the population by constructive tours
+    self.seedSolutions(bestSolutions)
     # creates the particles and initialization of swap sequences in all the particles
-    for solution in bestSolutions:
+    # evaluates all the solutions in one call
+    costs = self.graph.evaluateCosts(bestSolutions)
+    for solution, cost in zip(bestSolutions, costs):
       # creates a new particle
-      particle = Particle(solution=solution, cost=graph.evaluateCost(solution))
+      particle = Particle(solution=solution, cost=cost)
       # add the particle
       self.particles.append(particle)
     
@@ -73,7 +96,7 @@ class PSO:
     self.populationSize = len(self.particles)
 
   def initPopulation(self, population_size):
-    self.particles = Chromosome() # list of particles
+    self.particles = [] # list of particles
     solutions = self.graph.getRandomPaths(population_size)
     self.populationSize = population_size
 
@@ -96,22 +119,22 @@ class PSO:
       del solutions[:]
     
     
+    # replaces part of the population by constructive tours
+    self.seedSolutions(bestSolutions)
     # creates the particles and initialization of swap sequences in all the particles
-    for solution in bestSolutions:
+    # evaluates all the solutions in one call
+    costs = self.graph.evaluateCosts(bestSolutions)
+    for solution, cost in zip(bestSolutions, costs):
       # creates a new particle
-      particle = Particle(solution=solution, cost=graph.evaluateCost(solution))
+      particle = Particle(solution=solution, cost=cost)
       # add the particle
       self.particles.append(particle)    
     
   def evaluateSolutionsAverageCost(self, solutions):
   
-    totalCost = 0.0
-    i = 0
-    for solution in solutions:
-      cost = self.evaluateCost(solution)
-      totalCost += cost
-      i+=1
-    averageCost = totalCost / float(i)
+    # cost of every solution as a closed tour, in one call
+    costs = evaluateSwarmCosts(self.graph.costMatrix, solutions)
+    averageCost = sum(costs) / float(len(costs))
 
     return averageCost
 
@@ -137,12 +160,15 @@ class PSO:
   def getIter(self):
     return self.last_iter
 
-  def run(self):
+  # Runs the algorithm. stopping (see stopping.py) ends the run early, keeping the best route
+  # found so far in gbest. on_improvement is called with every new gbest (see anytime.py).
+  def run(self, stopping=None, on_improvement=None):
     # variables for convergence data
     convergenceData = []
     iterationArray = []
     bestCostArray = []
-    bestCostSampling = []
+    # last gbest costs (at most deviation_iteration), sampled every batchSize iterations
+    bestCostSampling = ConvergenceWindow(max(1, self.deviation_iteration))
 
 
     batchSize = 100 # save data every n iterations
@@ -150,6 +176,12 @@ class PSO:
     iteration = 0
     
     startTime = datetime.now()
+    startClock = perf_counter()
+    # the callback stops the run through the stopping rules
+    if on_improvement is not None and stopping is None:
+      stopping = StoppingRules()
+    if stopping is not None:
+      stopping.start(self.graph.evaluations)
     
     # updates gbest (best particle of the population)
     self.gbest = self.particles[0]
@@ -168,39 +200,16 @@ class PSO:
         particle.clearVelocity() # cleans the speed of the particle
         velocity = []
 
-        gbest = list(self.gbest.getPBest()) # gets solution of the gbest solution
+        gbest = self.gbest.getPBest()[:] # gets copy of the solution of the gbest solution
         pbest = particle.getPBest()[:] # copy of the pbest solution
         newSolution = particle.getCurrentSolution()[:] # gets copy of the current solution of the particle
         
 
         # generates all swap operators to calculate (pbest - x(t-1))
-        for i in range(self.graph.graphSize):
-          if newSolution[i] != pbest[i]:
-            # generates swap operator
-            swapOperation = (i, pbest.index(newSolution[i]), self.alfa)
-            # append swap operator in the list of velocity
-            velocity.append(swapOperation)
-            # makes the swap           
-            aux = pbest[swapOperation[0]]
-            pbest[swapOperation[0]] = pbest[swapOperation[1]]
-            pbest[swapOperation[1]] = aux
-            
-            #pbest[swapOperation[0]], pbest[swapOperation[1]] = pbest[swapOperation[1]], pbest[swapOperation[0]] 
-
+        velocity.extend(self.getSwapSequence(newSolution, pbest, self.alfa))
 
         # generates all swap operators to calculate (gbest - x(t-1))
-        for i in range(self.graph.graphSize):
-          if newSolution[i] != gbest[i]:
-            # generates swap operator
-            swapOperation = (i, gbest.index(newSolution[i]), self.beta)
-            # append swap operator in the list of velocity
-            velocity.append(swapOperation)
-            # makes the swap         
-            aux = gbest[swapOperation[0]]
-            gbest[swapOperation[0]] = gbest[swapOperation[1]]
-            gbest[swapOperation[1]] = aux
-            
-            #gbest[swapOperation[0]], gbest[swapOperation[1]] = gbest[swapOperation[1]], gbest[swapOperation[0]] 
+        velocity.extend(self.getSwapSequence(newSolution, gbest, self.beta))
         
         
         # updates velocity
@@ -210,14 +219,7 @@ class PSO:
         # Inverts the cities between the selected points        
         for swapOperation in velocity:
           if random.random() <= swapOperation[2]:
-            point1 = swapOperation[0]
-            point2 = swapOperation[1]
-            while True:
-              newSolution[point1],newSolution[point2] = newSolution[point2],newSolution[point1]
-              point1 = point1 + 1
-              point2 = point2 - 1
-              if point1 > point2:
-                break
+            reverseSegment(newSolution, swapOperation[0], swapOperation[1])
               
         
         # gets cost of the current solution
@@ -241,6 +243,11 @@ class PSO:
         # check if new solution is gbest solution
         if newSolutionCost < gbestCost:
           self.gbest = particle
+          if on_improvement is not None:
+            reportImprovement(on_improvement, stopping, self.gbest, 0, t, startClock)
+
+        if stopping is not None and stopping.shouldStop(self.gbest.getCostPBest(), self.graph.evaluations):
+          break
 
         convergencePerIteration.append(t)
         convergencePerIteration.append(self.gbest.getCostPBest())
@@ -253,19 +260,19 @@ class PSO:
           print(t, "Gbest cost = ", self.gbest.getCostPBest())
           #print("Standard deviation: ", std)
           batchCounter = 0
-          bestCostSampling.append(self.gbest.getCostPBest()) 
+          # from iteration_stop on, every new sample replaces the oldest one
           if t >= self.iteration_stop :
-             bestCostSampling = bestCostSampling[1:] 
+            bestCostSampling.freeze()
+          bestCostSampling.add(self.gbest.getCostPBest())
       t = t + 1
-      if t >= self.iteration_stop :
-        std = statistics.pstdev(bestCostSampling[-self.deviation_iteration:])
-      else:
-        std = 1000
-      
+      if stopping is not None and (stopping.reason is not None or stopping.endIteration(self.gbest.getCostPBest())):
+        self.setIter(t)
+        break
       if t==self.iterations:
         self.setIter(t)
 
-      if std == 0:
+      # the sampled gbest costs have not changed (or changed less than the tolerance)
+      if t >= self.iteration_stop and bestCostSampling.hasConverged(self.convergenceTolerance):
         self.setIter(t)
         break
 
@@ -285,118 +292,115 @@ class PSO:
     csvFile.close()
     
     """ 
+    self.stopReason = None if stopping is None else stopping.reason
     print("Elapsed time: ", self.elapsedTime(startTime))
   
   
 
-  # Calculate the objective function
+  # Generates the swap operators that turn the target route into the solution (target - x(t-1)).
+  # The target is modified by the swaps. position[city] keeps the index of each city in the target,
+  # so each operator is found in O(1) instead of with target.index().
+  def getSwapSequence(self, solution, target, probability):
+    velocity = []
+    position = newRoute(target)
+    for i in range(len(target)):
+      position[target[i]] = i
+    for i in range(self.graph.graphSize):
+      if solution[i] != target[i]:
+        # generates swap operator
+        swapOperation = (i, position[solution[i]], probability)
+        # append swap operator in the list of velocity
+        velocity.append(swapOperation)
+        # makes the swap and updates the positions of the two cities
+        target[swapOperation[0]], target[swapOperation[1]] = target[swapOperation[1]], target[swapOperation[0]]
+        position[target[swapOperation[0]]] = swapOperation[0]
+        position[target[swapOperation[1]]] = swapOperation[1]
+    return velocity
+
+  # Calculate the objective function (same as Graph.evaluateCost)
   def evaluateCost(self, route):
-    routeSize = len(route)
-    
-    # Determine the cost of traversing the cities
-    first = -1
-    second = -1
-    last = -1
-    cost = 0.0
-    #print(routeSize)
-    #print(route)
-    i = 0
-    while routeSize > 1 and i < routeSize-1:
-      first = route[i]
-      second = route[i+1]
-      cost = cost + GRAPH[first][second]
-      i = i + 1
-    # Complete Hamiltonian circuit
-    last = route[routeSize-1]
-    first = route[0]
-    cost = cost + GRAPH[last][first]
-    return cost  
-
-
-
-  def generateSavingsMatrix(self):
-    savingsMatrix = []
-    for i in range(1, GRAPH_SIZE):
-      for j in range(1, GRAPH_SIZE):
-        savings = GRAPH[i][0] + GRAPH[0][j] - GRAPH[i][j]
-        # saving = CWSA_mtx[i,-1] + CWSA_mtx[j,-1] - CWSA_mtx[i,j]
-        savingsMatrix.append(Savings(i, j, savings))
-    savingsMatrix = sorted(savingsMatrix, reverse=True)
-    return savingsMatrix
-    # sorted(student_objects, key=lambda student: student.age)
-
-  def getNodeFromSavings(self, last, savings_matrix  = [], best = []):
-    for i in range(len(savings_matrix)):
-      node = savings_matrix[i]
-      fromNode = node.get_from_node()
-      toNode = node.get_to_node()
-      #print("Last: ", last)
-      #print("fromNode:", fromNode)
-      #print("toNode:", toNode)
-      if fromNode == last and toNode not in best:
-        return toNode
+    return self.graph.evaluateCost(route)
+
+
+
+  # Generates a route with the savings method (see savings.py); the route starts at city 0
+  def getSavingsSolution(self):
+    return newRoute([0] + savingsTour(self.graph.costMatrix))
+
+  # Generates a route with the seed method of the solver. The greedy edge and savings routes do
+  # not change, so they are built once and only perturbed for every seed.
+  def getSeedSolution(self):
+    if self.seedMethod == 'nearest':
+      return seedRoute(self.seedMethod, self.graph.costMatrix, self.graph.getNeighbors(), depot=None)
+    if self.seedBase is None:
+      if self.seedMethod == 'savings':
+        self.seedBase = self.getSavingsSolution()
+      else:
+        self.seedBase = constructRoute(self.seedMethod, self.graph.costMatrix, self.graph.getNeighbors(), depot=None)
+    route = self.seedBase[:]
+    perturbRoute(route)
+    return route
+
+  # Replaces the first seedFraction of the solutions by seed routes
+  def seedSolutions(self, solutions):
+    for i in range(int(round(len(solutions) * self.seedFraction))):
+      solutions[i] = self.getSeedSolution()
 
 # class that represents a graph
 class Graph:
 
-  def __init__(self, amount_vertices, cost_table):
+  def __init__(self, amount_vertices, cost_table, cost_matrix=None, neighbors=None):
 
     self.costTable = cost_table
     self.graphSize = amount_vertices
-
-
-
-  # Calculate the objective function
+    # the same costs as a NumPy matrix, for the evaluation of many routes at once
+    if cost_matrix is None:
+      cost_matrix = np.array(cost_table, dtype=np.int32)
+    self.costMatrix = cost_matrix
+    # number of route costs computed so far (full evaluations and move deltas)
+    self.evaluations = 0
+    # K nearest cities of every city (built on first use when not given, see getNeighbors)
+    self.neighbors = neighbors
+
+  # Returns the candidate lists of the cities (an (N, K) matrix, nearest first)
+  def getNeighbors(self):
+    if self.neighbors is None:
+      self.neighbors = neighborLists(self.costMatrix, NEIGHBOR_LIST_SIZE)
+    return self.neighbors
+
+  # Calculate the objective function of several routes in one call
+  def evaluateCosts(self, routes):
+    self.evaluations += len(routes)
+    return evaluateSwarmCosts(self.costMatrix, routes)
+
+  # Calculate the objective function (closed tour)
   def evaluateCost(self, route):
-    routeSize = len(route)
-    
-    # Determine the cost of traversing the cities
-    first = -1
-    second = -1
-    last = -1
-    cost = 0.0
-    #print(routeSize)
-    #print(route)
-    i = 0
-    while routeSize > 1 and i < routeSize-1:
-      first = route[i]
-      second = route[i+1]
-      cost = cost + self.costTable[first][second]
-      i = i + 1
-    # Complete Hamiltonian circuit
-    last = route[routeSize-1]
-    first = route[0]
-    cost = cost + self.costTable[last][first]
-    return cost
+    self.evaluations += 1
+    return evaluateTourCost(self.costTable, route, cost_matrix=self.costMatrix)
 
 
 
   # gets random unique paths - returns a list of lists of paths
   def getRandomPaths(self, max_size):
     random_paths = []
+    # bytes of the routes already generated, to discard repeated routes in O(1)
+    generated = set()
     
     for i in range(max_size):
       
       list_temp = self.getRandomSolution(self.graphSize)
+      key = list_temp.tobytes()
 
-      if list_temp not in random_paths:
+      if key not in generated:
+        generated.add(key)
         random_paths.append(list_temp)
     return random_paths
     
   # Generate a random sequence and stores it
-  # as a Route
+  # as a Route (Fisher-Yates shuffle of the cities)
   def getRandomSolution(self, graph_size):
-    route = Chromosome()
-    visited = [0 for j in range(graph_size)]
-    city = -1
-    cityCount = 0
-    while cityCount < len(visited):
-      city = random.randint(0, graph_size-1)
-      while visited[city] == 1:
-        city = random.randint(0, graph_size-1)
-      route.append(city)
-      visited[city] = 1
-      cityCount = cityCount + 1
+    route = newRoute(range(0, graph_size))
+    random.shuffle(route)
     return route
 
 
@@ -467,13 +471,6 @@ class Particle:
   
   
 
-# Define Route as a subclass of list
-class Route(list):
-  def __init__(self):
-    self.elements = []
-  #def size(self):
-  #  return len(self.elements)
-
 # An Individual stores its route along with
 # its cost and fitness.
 class Individual:
@@ -502,151 +499,47 @@ class Individual:
     
 # Test code begins
 
-class Savings(object):
-  def __init__(self, from_node, to_node, savings_value):
-    self.from_node = from_node
-    self.to_node = to_node
-    self.savings_value = savings_value
-  
-  def get_from_node(self):
-    return self.from_node
-
-  def get_to_node(self):
-    return self.to_node
-        
-  def __repr__(self):
-    return repr((self.from_node, self.to_node, self.savings_value))
-    
-  def __lt__(self, other):
-    return self.savings_value < other.savings_value
-  
-  def __eq__(self, other):
-    return self.savings_value == other.savings_value
-
-
-class City:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-    
-    def set_x(self, x):
-        self.x = x
-    
-    def get_x(self):
-        return self.x
-    
-    def set_y(self, y):
-        self.y = y
-    
-    def get_y(self):
-        return self.y
-
-# Define Chromosome as a subclass of list
-class Chromosome(list):
-  def __init__(self):
-    self.elements = []
-
-
-
-# Nest nearest integer
-def nint(number):
-  return int(number + (0.5 if number > 0 else -0.5))
-  
-# Calculate Euclidean distance for one location
-def calculate_distance(x1, y1, x2, y2):
-    return math.sqrt(math.pow((x1 - x2), 2) + math.pow((y1 - y2), 2))
-
 def generateDistanceMatrix(file_name):
-  # Open input file
-  tsp = tsplib95.load(file_name)
-  if (tsp.is_explicit() and tsp.edge_weight_format=="LOWER_DIAG_ROW"):
-    graph=tsp.edge_weights
-    listgraph = [element for row in graph for element in row]
-    M = tsp.dimension
-    full_matrix = [[0] * M for _ in range(M)]
-    k = 0
-    for i in range(M):
-        for j in range(i + 1):
-            full_matrix[i][j] = listgraph[k]
-            full_matrix[j][i] = listgraph[k]  # Reflejar los valores en la parte superior de la diagonal
-            k += 1
-    return full_matrix
-  elif(tsp.is_explicit()):
-    graph=tsp.edge_weights
-    return graph
-  else:
-    infile = open(file_name, 'r')
-
-    # Read instance header
-    name = infile.readline().strip().split()[1] # NAME
-    fileType = infile.readline().strip().split()[1] # TYPE
-    comment = infile.readline().strip().split()[1] # COMMENT
-    dimension = infile.readline().strip().split()[1] # DIMENSION
-    edgeWeightType = infile.readline().strip().split()[1] # EDGE_WEIGHT_TYPE
-    infile.readline()
-
-    # Read node list
-    nodelist = []
-    #N = int(dimension)
-    print("Dimension: ", dimension)
-    print("Edge weight type: ", edgeWeightType)
-    for i in range(0, int(dimension)):
-      x,y = infile.readline().strip().split()[1:]    
-      newCity = City(float(x), float(y))
-      nodelist.append(newCity)
-        #nodelist.append([float(x), float(y)])
-
-    # Close input file
-    infile.close()
-
-    GRAPH = []
-    newDist = []
-    print("Dimension: ", dimension)
-    N = int(dimension)
-    for i  in range(0, N):
-      x_i = nodelist[i].get_x()
-      y_i = nodelist[i].get_y()
-      newDist = []
-      for j in range(0, len(nodelist)):
-        x_j = nodelist[j].get_x()
-        y_j = nodelist[j].get_y()
-        
-        #  edge weight type GEO means geographic coordinates
-        if edgeWeightType == "GEO":
-          deg = int(x_i)
-          min = x_i - deg
-          latitudeI = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          deg = int(y_i)
-          min = y_i - deg
-          longitudeI = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          deg = int(x_j)
-          min = x_j - deg
-          latitudeJ = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          deg = int(y_j)
-          min = y_j - deg
-          longitudeJ = math.pi * (deg + 5.0 * min / 3.0) / 180.0
-          
-          R = 6378.388 # Earth radius
-          q1 = math.cos( longitudeI - longitudeJ )
-          q2 = math.cos( latitudeI - latitudeJ )
-          q3 = math.cos( latitudeI + latitudeJ )
-          dist = int((R * math.acos(0.5*((1.0+q1)*q2-(1.0-q1)*q3))+1.0))
-          
-          if i == j:
-            dist = 0
-        else:
-          dist = nint(calculate_distance(x_i, y_i, x_j, y_j))
-        if dist == 0:
-          dist = 10000000
-        #newDist = []
-        #print("Distance 1: ", dist)
-        newDist.append(dist)
-      GRAPH.append(newDist)
-      #print(GRAPH)
-    return GRAPH
+  # The matrix is built in bulk with NumPy and cached on disk (see distance_matrix.py),
+  # then handed to the solver as a list of lists
+  matrix, x, y = cachedDistanceMatrix(file_name)
+  print("Dimension: ", len(matrix))
+  return matrix.tolist()
+
+# columns of the results file (one row per replicate, as returned by runReplicate)
+RESULTS_HEADER = ["Solution", "Cost", "Comp. time", "Max iter","iter convergence"]
+
+# Runs one replicate of the experiment and returns its row of the results file
+# seed_fraction and seed_method are given to PSO (see seeding.py)
+def runReplicate(graph, seed_fraction=0.0, seed_method='nearest'):
+  dimension = graph.graphSize
+  iteration_stop=int(round(((dimension**2)*.2*600)/150)) 
+  results = []
+  #pso = Solver(graph, iterations=1000, maxEpochs=80, size_population=15, beta=0.80, alfa=0.2)
+  #pso = Solver(graph, iterations=1000, maxEpochs=50, size_population=15, beta=0.51, alfa=0.11)
+  pso = PSO(iteration_stop, graph, iterations=int(round(600*dimension*((7*200)/150))) , size_population=150, alfa=0.47442915, beta=0.03153496,
+            seed_fraction=seed_fraction, seed_method=seed_method)
+  #Nodos(dimension)*Factor de 600 = iterations
+  #start_time = datetime.now()
+  start_process_time = process_time()
+  pso.run() # runs the PSO algorithm
+  results.append(pso.getGBest().getPBest().tolist())
+  results.append(pso.getGBest().getCostPBest())
+  iteration = pso.getIter()
+  iteration_convergence = iteration-iteration_stop
+  # dt = datetime.now() - start_time
+  # ms = (dt.days * 24 * 60 * 60 + dt.seconds) * 1000 + dt.microseconds / 1000.0
+  # results.append(ms)
+  processing_time = (process_time() - start_process_time) * 1000.0
+  results.append(processing_time)
+  results.append(iteration)
+  results.append(iteration_convergence)
+  # shows the global best particle
+  print("")
+  print("alfa: ", pso.alfa, "beta: ", pso.beta)
+  print("Cost of gbest: ", pso.getGBest().getCostPBest()) 
+  print("gbest: ", pso.getGBest().getPBest())
+  return results
 
 if __name__ == "__main__":
   # Read a TSP file and convert x,y coordinates to distance matrix
@@ -694,38 +587,13 @@ if __name__ == "__main__":
   
  
   
-  results = ["Solution", "Cost", "Comp. time", "Max iter","iter convergence"]
-  fileoutput = []
-  fileoutput.append(results)
   # def run_solver_with_params(params):
   #       alfa_prob, beta_prob = params
-  for i  in range(100):
-    results = []
-    #pso = Solver(graph, iterations=1000, maxEpochs=80, size_population=15, beta=0.80, alfa=0.2)
-    #pso = Solver(graph, iterations=1000, maxEpochs=50, size_population=15, beta=0.51, alfa=0.11)
-    pso = PSO(iteration_stop, graph, iterations=int(round(600*dimension*((7*200)/150))) , size_population=150, alfa=0.47442915, beta=0.03153496)
-    #Nodos(dimension)*Factor de 600 = iterations
-    #start_time = datetime.now()
-    start_process_time = process_time()
-    pso.run() # runs the PSO algorithm
-    results.append(pso.getGBest().getPBest())
-    results.append(pso.getGBest().getCostPBest())
-    iteration = pso.getIter()
-    iteration_convergence = iteration-iteration_stop
-    # dt = datetime.now() - start_time
-    # ms = (dt.days * 24 * 60 * 60 + dt.seconds) * 1000 + dt.microseconds / 1000.0
-    # results.append(ms)
-    processing_time = (process_time() - start_process_time) * 1000.0
-    results.append(processing_time)
-    results.append(iteration)
-    results.append(iteration_convergence)
-    fileoutput.append(results)
-    # shows the global best particle
-    print("")
-    print("alfa: ", pso.alfa, "beta: ", pso.beta)
-    print("Cost of gbest: ", pso.getGBest().getCostPBest()) 
-    print("gbest: ", pso.getGBest().getPBest())
-    #del pso
+  # runs the 100 replicates on a pool of processes that share GRAPH (see experiment.py);
+  # each row is written to pso.csv as soon as its replicate finishes (see results_sink.py)
+  with ResultsSink('pso.csv', RESULTS_HEADER) as sink:
+    for replicate, seed, row in iterateExperiment('pso', GRAPH, replicates=100):
+      sink.write(replicate, seed, row)
     
   # parameter_sets = [
   #   (0.01408918, 0.36408546),
@@ -766,11 +634,6 @@ if __name__ == "__main__":
   #   run_solver_with_params(params)
   #   print(f"Iteration {iteration}, Parameters: {params}")
   
-  csvFile = open('pso.csv', 'w', newline='')  
-  with csvFile: 
-    writer = csv.writer(csvFile)
-    writer.writerows(fileoutput)
-  csvFile.close()
 
 
   # shows the global best particle
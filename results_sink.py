@@ -0,0 +1,100 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Results file of an experiment, written one replicate at a time.
+# Every row is appended and flushed to disk as soon as its replicate finishes, so a crash only loses
+# the replicates that were running. The rows already on disk tell which replicates are done, and
+# a batch can be resumed by running only the missing ones.
+# The format is chosen by the extension of the file: JSON Lines for .jsonl, CSV otherwise.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+import csv
+import io
+import json
+import os
+
+
+# columns added after the results of a replicate
+REPLICATE_COLUMN = "Replicate"
+SEED_COLUMN = "Seed"
+
+
+class ResultsSink:
+
+  # header is the list of columns returned by runReplicate.
+  # With resume=True the rows of an existing file are kept. Otherwise a file that already has
+  # results is only replaced with overwrite=True, so they are not lost by mistake.
+  def __init__(self, path, header, resume=False, overwrite=False):
+    self.path = path
+    self.header = list(header) + [REPLICATE_COLUMN, SEED_COLUMN]
+    self.jsonLines = path.endswith('.jsonl')
+    self.completed = set()
+    if not resume and not overwrite and os.path.exists(path) and os.path.getsize(path) > 0:
+      raise FileExistsError(path + " already has results: resume it or overwrite it")
+    if resume and os.path.exists(path):
+      self.completed = self.readCompleted()
+      self.file = open(path, 'a', newline='')
+    else:
+      self.file = open(path, 'w', newline='')
+    if not self.jsonLines and self.file.tell() == 0:
+      self.writeLine(self.formatCsv(self.header))
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  # Returns the replicates already in the file. A last line cut by a crash is removed.
+  def readCompleted(self):
+    with open(self.path, 'rb') as infile:
+      content = infile.read()
+    end = content.rfind(b'\n') + 1
+    if end < len(content):
+      with open(self.path, 'r+b') as outfile:
+        outfile.truncate(end)
+    lines = content[:end].decode('utf-8').splitlines()
+
+    completed = set()
+    if self.jsonLines:
+      for line in lines:
+        if line.strip():
+          completed.add(json.loads(line)[REPLICATE_COLUMN])
+      return completed
+
+    rows = list(csv.reader(lines))
+    if not rows:
+      return completed
+    if rows[0] != self.header:
+      raise ValueError("The columns of " + self.path + " do not match the results of this experiment")
+    column = rows[0].index(REPLICATE_COLUMN)
+    for row in rows[1:]:
+      completed.add(int(row[column]))
+    return completed
+
+  def formatCsv(self, values):
+    line = io.StringIO()
+    csv.writer(line).writerow(values)
+    return line.getvalue()
+
+  # Writes a whole line and makes sure it reaches the disk
+  def writeLine(self, line):
+    self.file.write(line)
+    self.file.flush()
+    os.fsync(self.file.fileno())
+
+  # Appends the row of a replicate
+  def write(self, replicate, seed, row):
+    values = list(row) + [replicate, seed]
+    if self.jsonLines:
+      self.writeLine(json.dumps(dict(zip(self.header, values))) + '\n')
+    else:
+      self.writeLine(self.formatCsv(values))
+    self.completed.add(replicate)
+
+  def close(self):
+    self.file.close()
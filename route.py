@@ -0,0 +1,72 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Compact route representation shared by MEPSO I, MEPSO II and PSO.
+# A route is an array of C ints (4 bytes per city) instead of a list of boxed Python ints.
+# Slicing a route returns a new array, so route[:] remains the way to copy it, and the copy
+# is a single memory copy.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+from array import array
+from collections import deque
+import numpy as np
+
+
+# type code of the array that stores the cities of a route
+ROUTE_TYPECODE = 'i'
+
+
+# Creates a route from a sequence of cities (an empty route by default)
+def newRoute(cities=()):
+  return array(ROUTE_TYPECODE, cities)
+
+# Stacks routes of the same length into a (P, N) NumPy matrix, one route per row
+def stackRoutes(routes):
+  return np.frombuffer(b''.join(route.tobytes() for route in routes), dtype=np.intc).reshape(len(routes), -1)
+
+# Reverses in place the cities between point1 and point2 (both included, point1 < point2)
+def reverseSegment(route, point1, point2):
+  route[point1:point2+1] = route[point1:point2+1][::-1]
+
+# Memory of past routes (the tabu list of a particle).
+# Each route is stored as the bytes of its array in a set, so a membership test costs O(N) for a
+# route of N cities (copying and hashing its bytes in C) instead of comparing the route element
+# by element with every entry. A route is only added when it is not in the history, so the set
+# holds each entry once. A deque keeps the insertion order, so the oldest route is evicted in
+# O(1) when the history reaches its size.
+class RouteHistory:
+  __slots__ = ['order', 'keys']
+
+  def __init__(self):
+    self.order = deque()
+    self.keys = set()
+
+  def __len__(self):
+    return len(self.order)
+
+  def __contains__(self, route):
+    return route.tobytes() in self.keys
+
+  # adds a route (not in the history) as the newest entry
+  def append(self, route):
+    key = route.tobytes()
+    self.order.append(key)
+    self.keys.add(key)
+
+  # removes the oldest entry
+  def popleft(self):
+    self.keys.discard(self.order.popleft())
+
+# Returns an array with the city that follows each city in the route, so that the neighbor
+# of a city is found in O(1). The last city is followed by the first one (closed tour).
+# size is the number of cities of the instance; cities not in the route get -1.
+def successorArray(route, size):
+  successor = newRoute([-1]) * size
+  for i in range(len(route) - 1):
+    successor[route[i]] = route[i+1]
+  successor[route[-1]] = route[0]
+  return successor
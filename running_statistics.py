@@ -0,0 +1,104 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Running mean and population standard deviation of a fixed set of values (the pbest costs of
+# the swarm), kept up to date as single values change.
+# The sum and the sum of squares of the values are updated in O(1) when a value is replaced, so
+# reading the statistics does not need a pass over the swarm. The costs are whole numbers (stored
+# as floats); they are added as Python ints, so both sums are exact and do not drift however many
+# times the values are replaced.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+import math
+
+
+# Returns a whole float as an int, so that it is added to the sums without rounding
+def exactValue(value):
+  if isinstance(value, float) and value.is_integer():
+    return int(value)
+  return value
+
+class RunningStatistics:
+  __slots__ = ['count', 'sum', 'sumSquares']
+
+  def __init__(self, values=()):
+    self.count = 0
+    self.sum = 0
+    self.sumSquares = 0
+    for value in values:
+      self.add(value)
+
+  # adds a value to the set
+  def add(self, value):
+    value = exactValue(value)
+    self.count += 1
+    self.sum += value
+    self.sumSquares += value * value
+
+  # replaces a value of the set by a new one
+  def replace(self, old_value, new_value):
+    old_value = exactValue(old_value)
+    new_value = exactValue(new_value)
+    self.sum += new_value - old_value
+    self.sumSquares += new_value * new_value - old_value * old_value
+
+  def getMean(self):
+    return self.sum / self.count
+
+  # population standard deviation (as statistics.pstdev)
+  def getStd(self):
+    variance = (self.sumSquares * self.count - self.sum * self.sum) / (self.count * self.count)
+    # with values that are not whole, rounding can leave a tiny negative variance
+    return math.sqrt(max(variance, 0.0))
+
+# The last size values of a series (a ring buffer) with their running statistics, used to
+# detect that the sampled gbest cost has stopped changing.
+# Adding a value replaces the oldest one in O(1). The number of equal values at the end of the
+# series is counted, so "all the values in the window are equal" (standard deviation 0) is an
+# exact test that does not depend on the rounding of the sums.
+class ConvergenceWindow:
+  __slots__ = ['size', 'values', 'oldest', 'statistics', 'equalRun']
+
+  def __init__(self, size):
+    self.size = size
+    self.values = []
+    self.oldest = 0
+    self.statistics = RunningStatistics()
+    self.equalRun = 0
+
+  def __len__(self):
+    return len(self.values)
+
+  def add(self, value):
+    if self.values and value == self.values[self.oldest - 1]:
+      self.equalRun += 1
+    else:
+      self.equalRun = 1
+    if len(self.values) < self.size:
+      self.values.append(value)
+      self.statistics.add(value)
+    else:
+      self.statistics.replace(self.values[self.oldest], value)
+      self.values[self.oldest] = value
+      self.oldest = (self.oldest + 1) % self.size
+
+  # Stops the window from growing: from now on it keeps as many values as it has (at least one)
+  def freeze(self):
+    self.size = max(1, len(self.values))
+
+  # standard deviation of the values in the window
+  def getStd(self):
+    return self.statistics.getStd()
+
+  # True when all the values in the window are equal or, with a tolerance, when their
+  # standard deviation is not larger than it
+  def hasConverged(self, tolerance=0.0):
+    if not self.values:
+      return False
+    if self.equalRun >= len(self.values):
+      return True
+    return tolerance > 0.0 and self.getStd() <= tolerance
@@ -0,0 +1,160 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Constructive tours used to seed part of the initial populations of MEPSO I, MEPSO II and PSO:
+#   'nearest': nearest neighbour tour from a random city
+#   'greedy': greedy edge tour (shortest edges first, no city with more than two edges, no subtours)
+#   'savings': Clarke-Wright savings tour (see savings.py)
+# The nearest neighbour and greedy edge tours only look at the candidate lists of the cities (their
+# K nearest cities), so they take about O(N K) steps; the full row of the matrix is read only when
+# all the candidates of a city are already in the tour.
+# Every seed is perturbed with one random reversal, so the seeded particles are not all equal. The
+# greedy edge and savings tours are the same every time, so the solvers build them only once.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+import random
+import numpy as np
+from route import newRoute, reverseSegment
+from savings import savingsTour
+
+
+# construction methods that can be used to seed a population
+SEED_METHODS = ['nearest', 'greedy', 'savings']
+
+
+# Returns the nearest city to current that is not visited (mask is True for the visited cities)
+def nearestUnvisited(matrix, current, mask, cities=None):
+  if cities is None:
+    costs = np.asarray(matrix[current])
+    return int(np.argmin(np.where(mask, np.iinfo(costs.dtype).max, costs)))
+  costs = np.asarray(matrix[current])[cities]
+  return int(cities[np.argmin(np.where(mask[cities], np.iinfo(costs.dtype).max, costs))])
+
+# Nearest neighbour tour (a cycle over all the cities) starting at the given city
+def nearestNeighbourTour(matrix, neighbors, start):
+  size = len(matrix)
+  candidates = neighbors.tolist()
+  visited = bytearray(size)
+  mask = np.frombuffer(visited, dtype=np.bool_)
+  tour = [start]
+  visited[start] = 1
+  current = start
+  for i in range(size - 1):
+    for city in candidates[current]:
+      if not visited[city]:
+        break
+    else:
+      city = nearestUnvisited(matrix, current, mask)
+    visited[city] = 1
+    tour.append(city)
+    current = city
+  return tour
+
+# Greedy edge tour (a cycle over all the cities).
+# The candidate edges are taken from the shortest; an edge is kept if both cities have less than two
+# edges and it does not close a subtour. The paths that are left are joined end to end, always
+# going to the nearest free end.
+def greedyEdgeTour(matrix, neighbors):
+  matrix = np.asarray(matrix)
+  size = len(matrix)
+  k = neighbors.shape[1]
+  rows = np.repeat(np.arange(size), k)
+  columns = neighbors.ravel().astype(np.int64)
+  first = np.minimum(rows, columns)
+  second = np.maximum(rows, columns)
+  index = np.unique(first * size + second, return_index=True)[1]
+  first = first[index]
+  second = second[index]
+  # an edge costs the cheaper of its two directions
+  costs = np.minimum(matrix[first, second], matrix[second, first])
+  order = np.argsort(costs, kind='stable')
+
+  degree = bytearray(size)
+  adjacency = [[] for i in range(size)]
+  parent = list(range(size))
+
+  # root of the path of a city (union-find with path halving)
+  def find(city):
+    while parent[city] != city:
+      parent[city] = parent[parent[city]]
+      city = parent[city]
+    return city
+
+  for a, b in zip(first[order].tolist(), second[order].tolist()):
+    if degree[a] < 2 and degree[b] < 2:
+      rootA = find(a)
+      rootB = find(b)
+      if rootA != rootB:
+        parent[rootA] = rootB
+        degree[a] += 1
+        degree[b] += 1
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+
+  # free ends of the paths (a city without edges is a path with a single city)
+  ends = np.array([city for city in range(size) if degree[city] < 2], dtype=np.int64)
+  visited = bytearray(size)
+  mask = np.frombuffer(visited, dtype=np.bool_)
+  tour = []
+  current = int(ends[0])
+  while True:
+    # walk the path to its other end
+    previous = -1
+    while True:
+      tour.append(current)
+      visited[current] = 1
+      following = -1
+      for city in adjacency[current]:
+        if city != previous:
+          following = city
+      if following == -1:
+        break
+      previous = current
+      current = following
+    if len(tour) == size:
+      return tour
+    current = nearestUnvisited(matrix, current, mask, ends)
+
+# Turns a cycle over all the cities into a route: the cycle itself when depot is None (PSO), or
+# the cities after the depot, without it, when the route starts and ends at the depot (MEPSO).
+# Both have the same cost as the cycle.
+def cycleToRoute(cycle, depot=None):
+  if depot is None:
+    return newRoute(cycle)
+  position = cycle.index(depot)
+  return newRoute(cycle[position+1:] + cycle[:position])
+
+# Reverses a random segment of the route
+def perturbRoute(route):
+  if len(route) < 2:
+    return
+  while True:
+    point1 = random.randint(0, len(route)-1)
+    point2 = random.randint(0, len(route)-1)
+    if point1 < point2:
+      break
+  reverseSegment(route, point1, point2)
+
+# Builds the route of one of the SEED_METHODS, without the perturbation (see cycleToRoute for the
+# depot). Only the nearest neighbour tour changes between calls (it starts at a random city).
+def constructRoute(method, matrix, neighbors, depot=None):
+  if method == 'nearest':
+    cycle = nearestNeighbourTour(matrix, neighbors, random.randrange(len(matrix)))
+  elif method == 'greedy':
+    cycle = greedyEdgeTour(matrix, neighbors)
+  elif method == 'savings':
+    center = 0 if depot is None else depot
+    cycle = [center] + savingsTour(matrix, center)
+  else:
+    raise ValueError("Unknown seed method: " + str(method))
+  return cycleToRoute(cycle, depot)
+
+# Builds a seed route with one of the SEED_METHODS and perturbs it
+def seedRoute(method, matrix, neighbors, depot=None):
+  route = constructRoute(method, matrix, neighbors, depot)
+  perturbRoute(route)
+  return route
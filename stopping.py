@@ -0,0 +1,66 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Stopping rules for MEPSO I, MEPSO II and PSO, checked on top of their own termination
+# (number of iterations and epochs, standard deviation of the sampled gbest costs):
+#   max_time: seconds of wall time since the start of the run
+#   max_evaluations: number of route costs computed by the graph during the run
+#   target_cost: stop as soon as gbest costs this much or less
+#   max_stall: iterations in a row without an improvement of gbest
+# The first three are checked after every particle move, so the run stops within one move of the
+# budget being exhausted; the stall window is checked at the end of every iteration.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+from time import perf_counter
+
+
+class StoppingRules:
+  __slots__ = ['maxTime', 'maxEvaluations', 'targetCost', 'maxStall',
+               'deadline', 'firstEvaluation', 'bestCost', 'stall', 'reason']
+
+  # every rule left as None is not applied
+  def __init__(self, max_time=None, max_evaluations=None, target_cost=None, max_stall=None):
+    self.maxTime = max_time
+    self.maxEvaluations = max_evaluations
+    self.targetCost = target_cost
+    self.maxStall = max_stall
+    self.start()
+
+  # Starts counting from now; evaluations is the number of costs computed by the graph so far
+  def start(self, evaluations=0):
+    self.deadline = None if self.maxTime is None else perf_counter() + self.maxTime
+    self.firstEvaluation = evaluations
+    self.bestCost = float('inf')
+    self.stall = 0
+    # name of the rule that stopped the run (None while it goes on)
+    self.reason = None
+
+  # Stops the run for a reason other than the rules (for example, asked by the caller)
+  def stop(self, reason):
+    self.reason = reason
+
+  # Checked after each particle move with the cost of gbest and the evaluation counter of the graph
+  def shouldStop(self, best_cost, evaluations):
+    if self.reason is None:
+      if self.targetCost is not None and best_cost <= self.targetCost:
+        self.reason = 'target cost'
+      elif self.maxEvaluations is not None and evaluations - self.firstEvaluation >= self.maxEvaluations:
+        self.reason = 'max evaluations'
+      elif self.deadline is not None and perf_counter() >= self.deadline:
+        self.reason = 'max time'
+    return self.reason is not None
+
+  # Checked at the end of each iteration with the cost of gbest
+  def endIteration(self, best_cost):
+    if best_cost < self.bestCost:
+      self.bestCost = best_cost
+      self.stall = 0
+    else:
+      self.stall += 1
+      if self.maxStall is not None and self.stall >= self.maxStall:
+        self.reason = 'no improvement'
+    return self.reason is not None
@@ -0,0 +1,73 @@
+# encoding:utf-8
+
+########################################################################################################################
+# Cost of the routes of MEPSO I, MEPSO II and PSO.
+# Every route cost is computed here, in one of two explicit modes:
+#   depot=None: the route is a closed tour over all its cities (PSO)
+#   depot=0: the route leaves from the depot and returns to it, and the depot is not part of the route (MEPSO)
+# The cost of one route is computed by a function compiled with Numba when it is installed, and by
+# the pure Python loop otherwise. The routes of a whole swarm are stacked into a (P, N) matrix and the
+# distances of all their edges are read from the distance matrix with a single fancy-indexed gather.
+#
+# Authors: Rafael Batres, Ariann Fernando Arriaga Alcántara, Juan Carlos Espinoza García, José Carlos Bañales López.
+# Institution: Tecnologico de Monterrey
+########################################################################################################################
+
+
+import numpy as np
+from route import stackRoutes
+
+try:
+  from numba import njit
+except ImportError:
+  njit = None
+
+
+# True when the cost of a route is computed by the compiled function
+NUMBA_AVAILABLE = njit is not None
+
+
+# Pure Python cost of one route. cost_table can be a list of lists, the rows of the
+# shared matrix or a NumPy matrix (anything indexed as cost_table[i][j]).
+def pythonTourCost(cost_table, route, depot=None):
+  if depot is None:
+    cost = cost_table[route[-1]][route[0]]
+  else:
+    cost = cost_table[depot][route[0]] + cost_table[route[-1]][depot]
+  for i in range(len(route) - 1):
+    cost += cost_table[route[i]][route[i+1]]
+  return float(cost)
+
+if NUMBA_AVAILABLE:
+  # Compiled cost of one route given as a NumPy array (depot < 0 means a closed tour)
+  @njit(cache=True, nogil=True)
+  def compiledTourCost(matrix, route, depot):
+    last = route.shape[0] - 1
+    if depot < 0:
+      cost = np.int64(matrix[route[last], route[0]])
+    else:
+      cost = np.int64(matrix[depot, route[0]]) + matrix[route[last], depot]
+    for i in range(last):
+      cost += matrix[route[i], route[i+1]]
+    return cost
+
+# Returns the cost of one route (as a float).
+# The compiled function is used when Numba is installed and the NumPy matrix is given.
+def evaluateTourCost(cost_table, route, depot=None, cost_matrix=None):
+  if NUMBA_AVAILABLE and cost_matrix is not None:
+    return float(compiledTourCost(cost_matrix, np.asarray(route, dtype=np.intc), -1 if depot is None else depot))
+  return pythonTourCost(cost_table, route, depot)
+
+
+# Returns the costs (as floats) of P routes, given as a list of routes or a (P, N) matrix.
+# With depot=None every route is a closed tour (PSO). Otherwise the route starts and ends
+# at the depot, which is not part of the route (MEPSO I and MEPSO II).
+def evaluateSwarmCosts(matrix, routes, depot=None):
+  if not isinstance(routes, np.ndarray):
+    routes = stackRoutes(routes)
+  if depot is None:
+    costs = matrix[routes, np.roll(routes, -1, axis=1)].sum(axis=1, dtype=np.int64)
+  else:
+    costs = (matrix[routes[:, :-1], routes[:, 1:]].sum(axis=1, dtype=np.int64)
+             + matrix[depot, routes[:, 0]] + matrix[routes[:, -1], depot])
+  return costs.astype(np.float64).tolist()